@@ -13,7 +13,12 @@ from telegram.ext import ContextTypes, ConversationHandler
 from core.models import ChatMessage, ChatSession, KnowledgeDocument, UserProfile
 from core.services.rag_client import RAGClient
 from core.exceptions import RAGServiceError
-from core.tasks import push_document_to_rag, reprocess_document_in_rag, broadcast_message_task
+from core.tasks import (
+    push_document_to_rag,
+    push_documents_to_rag_bulk,
+    reprocess_document_in_rag,
+    broadcast_message_task,
+)
 from core.services import metrics
 from bot.constants import (
     ADMIN_MAIN,
@@ -614,10 +619,14 @@ async def admin_channels_add_message_count_handler(
 
     from monitoring.models import MonitoredChannel
 
-    channel, created = await MonitoredChannel.objects.aupdate_or_create(
+    channel, created = await MonitoredChannel.objects.aget_or_create(
         username=channel_username,
         defaults={"rag_message_count": message_count},
     )
+    if not created:
+        # Goes through the model so a larger count also resets the watermark.
+        channel.set_rag_message_count(message_count)
+        await channel.asave(update_fields=["rag_message_count", "last_message_id"])
 
     if created:
         await update.message.reply_text(
@@ -774,8 +783,8 @@ async def _handle_push_unindexed(query: "CallbackQuery") -> None:
             )
         )()
     )
-    for doc_id in doc_ids:
-        push_document_to_rag.delay(doc_id)
+    if doc_ids:
+        push_documents_to_rag_bulk.delay(doc_ids)
     await query.edit_message_text(
         f"📤 {len(doc_ids)} سند در صف ارسال به RAG قرار گرفت.",
         reply_markup=admin_main_keyboard(),
@@ -75,29 +75,29 @@ class KnowledgeDocumentAdmin(admin.ModelAdmin):
 
     def push_to_rag(self, request, queryset):
         """Push selected documents to RAG service asynchronously using Celery."""
-        from .tasks import push_document_to_rag
-
-        queued = 0
-        for doc in queryset:
-            try:
-                # Queue the task
-                push_document_to_rag.delay(doc.id)
-                queued += 1
-                logger.info(
-                    f"Queued document '{doc.title}' (ID: {doc.id}) for RAG push")
-            except Exception as e:
-                error_msg = f"'{doc.title}': Failed to queue task - {e}"
-                logger.error(error_msg)
-                self.message_user(
-                    request, error_msg, level=messages.ERROR
-                )
-
-        if queued > 0:
+        from .tasks import push_documents_to_rag_bulk
+
+        doc_ids = list(queryset.values_list("id", flat=True))
+        if not doc_ids:
+            return
+
+        try:
+            # Queue a single bulk task for the whole selection
+            push_documents_to_rag_bulk.delay(doc_ids)
+            logger.info(f"Queued {len(doc_ids)} documents for bulk RAG push")
+        except Exception as e:
+            error_msg = f"Failed to queue bulk RAG push - {e}"
+            logger.error(error_msg)
             self.message_user(
-                request,
-                f"✅ {queued} سند در صف ارسال به RAG قرار گرفت. پردازش در پس‌زمینه انجام می‌شود.",
-                level=messages.SUCCESS
+                request, error_msg, level=messages.ERROR
             )
+            return
+
+        self.message_user(
+            request,
+            f"✅ {len(doc_ids)} سند در صف ارسال به RAG قرار گرفت. پردازش در پس‌زمینه انجام می‌شود.",
+            level=messages.SUCCESS
+        )
 
     push_to_rag.short_description = "📤 ارسال اسناد انتخاب‌شده به RAG"
 
@@ -63,6 +63,14 @@ class TelegramConfig:
             "TELEGRAM_DEDUP_BY_CONTENT", default=False, cast=bool
         )
 
+    @staticmethod
+    def get_harvest_concurrency() -> int:
+        """Get the maximum number of channel harvests running at once."""
+        return int(
+            getattr(settings, "TELEGRAM_HARVEST_CONCURRENCY", None)
+            or config("TELEGRAM_HARVEST_CONCURRENCY", default=4, cast=int)
+        )
+
     @staticmethod
     def get_webhook_domain() -> Optional[str]:
         """Get webhook domain for production."""
@@ -129,6 +137,22 @@ class RAGConfig:
             or config("RAG_MICROSERVICE", default="telegram_bot")
         )
 
+    @staticmethod
+    def get_task_pool_size() -> int:
+        """Get the thread pool size of the background event loop's default executor."""
+        return int(
+            getattr(settings, "RAG_TASK_POOL", None)
+            or config("RAG_TASK_POOL", default=64, cast=int)
+        )
+
+    @staticmethod
+    def get_batch_size() -> int:
+        """Get the number of messages sent in one bulk ingest request."""
+        return int(
+            getattr(settings, "RAG_BATCH_SIZE", None)
+            or config("RAG_BATCH_SIZE", default=32, cast=int)
+        )
+
 
 class LLMConfig:
     """LLM service configuration."""
@@ -21,6 +21,16 @@ class RAGServiceError(ServiceError):
     pass
 
 
+class BulkDeleteUnsupportedError(RAGServiceError):
+    """Raised when the RAG service does not expose the bulk delete endpoint."""
+    pass
+
+
+class BulkIngestUnsupportedError(RAGServiceError):
+    """Raised when the RAG service does not expose the bulk ingest endpoint."""
+    pass
+
+
 class LLMServiceError(ServiceError):
     """Raised when LLM service operations fail."""
     pass
@@ -0,0 +1,122 @@
+"""
+Process-wide background event loop for running coroutines from sync code.
+
+Celery tasks and Django signal handlers are synchronous, while RAGClient is built
+on ``httpx.AsyncClient``, whose connection pool is bound to the event loop it was
+first used on. Running every call on a fresh loop throws that pool away (and
+breaks a reused client with "Event loop is closed"), so sync callers submit their
+coroutines to one long-lived loop per process instead.
+"""
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Coroutine, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BackgroundEventLoop:
+    """An asyncio event loop running forever in a daemon thread."""
+
+    def __init__(self, name: str = "BackgroundEventLoop", max_workers: Optional[int] = None):
+        self._loop = asyncio.new_event_loop()
+        if max_workers:
+            # The stock default executor is capped at min(32, cpu_count + 4),
+            # which throttles to_thread/getaddrinfo fan-out on I/O-bound work.
+            self._loop.set_default_executor(
+                ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix=f"{name}-executor")
+            )
+        self._thread = threading.Thread(
+            target=self._run_forever, name=name, daemon=True)
+        self._thread.start()
+
+    def _run_forever(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The underlying event loop."""
+        return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """
+        Run a coroutine on the background loop and block until it finishes.
+
+        Args:
+            coro: Coroutine to execute
+            timeout: Optional number of seconds to wait for the result
+
+        Returns:
+            The coroutine's result
+
+        If the wait is interrupted (the timeout expires, or e.g. Celery raises
+        SoftTimeLimitExceeded in the waiting thread), the coroutine is cancelled
+        rather than left running behind the caller's back.
+        """
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError(
+                "Cannot block on the background event loop from its own thread")
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stop(self) -> None:
+        """Stop the loop and wait for its thread to exit."""
+        if self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+_background_loop: Optional[BackgroundEventLoop] = None
+_background_loop_pid: Optional[int] = None
+_background_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> BackgroundEventLoop:
+    """
+    Return this process's background loop, creating it on first use.
+
+    Threads do not survive fork, so a loop inherited from the parent process
+    (e.g. a Celery prefork master) is replaced with a fresh one.
+    """
+    global _background_loop, _background_loop_pid
+
+    pid = os.getpid()
+    with _background_loop_lock:
+        if _background_loop is None or _background_loop_pid != pid:
+            from core.config import RAGConfig
+
+            _background_loop = BackgroundEventLoop(
+                max_workers=RAGConfig.get_task_pool_size())
+            _background_loop_pid = pid
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Started background event loop in process %s", pid)
+        return _background_loop
+
+
+def run_sync(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """Run a coroutine on the process-wide background loop and return its result."""
+    return get_background_loop().run(coro, timeout)
+
+
+def shutdown_background_loop() -> None:
+    """Stop the process-wide background loop if this process started one."""
+    global _background_loop, _background_loop_pid
+
+    with _background_loop_lock:
+        if _background_loop is not None and _background_loop_pid == os.getpid():
+            _background_loop.stop()
+        _background_loop = None
+        _background_loop_pid = None
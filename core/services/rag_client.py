@@ -1,18 +1,40 @@
 import os
+import json
+import importlib.util
 import logging
 import time
 import asyncio
+import random
 from typing import Any, Dict, Optional, List
 import httpx
-from core.exceptions import RAGServiceError
+from core.exceptions import (
+    RAGServiceError,
+    BulkDeleteUnsupportedError,
+    BulkIngestUnsupportedError,
+)
 from core.config import RAGConfig
 from core.services import metrics
+from core.services.event_loop import run_sync
 
 logger = logging.getLogger(__name__)
 
 # Backward compatibility alias
 RAGClientError = RAGServiceError
 
+# Seconds to fall back to per-message ingest after the bulk endpoint was
+# missing, before probing it again (e.g. once a RAG deploy has finished).
+_BULK_INGEST_REPROBE_INTERVAL = 10 * 60
+
+
+def _encode_json(payload: Any) -> bytes:
+    """
+    Serialize a request body once, as compact UTF-8 JSON.
+
+    Channel messages are mostly Persian; escaping them to \\uXXXX (as some
+    httpx versions do for ``json=``) roughly triples their size on the wire.
+    """
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
 
 class RAGClient:
     """
@@ -24,6 +46,9 @@ class RAGClient:
     - POST /knowledge/documents/ - Ingest text document
     - POST /knowledge/documents/ingest-url/ - Ingest document from URL
     - POST /knowledge/documents/{id}/reprocess/ - Reprocess a document
+    - DELETE /knowledge/documents/{id}/ - Delete a document
+    - POST /knowledge/documents/bulk-delete/ - Delete many documents at once
+    - POST /knowledge/documents/ingest-channel-messages/ - Ingest many channel messages at once
     """
 
     def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None, timeout: Optional[float] = None):
@@ -44,6 +69,12 @@ class RAGClient:
         )
 
         self.timeout = timeout or float(os.getenv("RAG_TIMEOUT", "30"))
+        # Retry knobs for channel message ingest, parsed once rather than per call
+        self.max_retries = int(os.getenv("RAG_MAX_RETRIES", "3"))
+        self.retry_delay = float(os.getenv("RAG_RETRY_DELAY", "1.0"))
+        # Set when the service answers that it has no bulk ingest endpoint, so
+        # later batches fall back without another round-trip until it passes.
+        self._bulk_ingest_unsupported_until = 0.0
 
         # Create httpx client with detailed configuration
         client_timeout = httpx.Timeout(
@@ -55,19 +86,39 @@ class RAGClient:
 
         # Configure limits for connection pool
         limits = httpx.Limits(
-            max_keepalive_connections=int(os.getenv("RAG_MAX_KEEPALIVE", "5")),
-            max_connections=int(os.getenv("RAG_MAX_CONNECTIONS", "10")),
+            max_keepalive_connections=int(os.getenv("RAG_MAX_KEEPALIVE", "16")),
+            max_connections=int(os.getenv("RAG_MAX_CONNECTIONS", "32")),
         )
 
+        # HTTP/2 multiplexes concurrent requests over one TLS connection. It needs
+        # the optional h2 package (pip install "httpx[http2]") and is negotiated
+        # via ALPN, so servers without it keep talking HTTP/1.1.
+        http2 = os.getenv("RAG_HTTP2", "False").lower() in ("true", "1", "yes")
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning(
+                "RAG_HTTP2 is enabled but the h2 package is not installed; using HTTP/1.1")
+            http2 = False
+
         self._client = httpx.AsyncClient(
             timeout=client_timeout,
             limits=limits,
+            http2=http2,
             follow_redirects=True,
         )
 
         if logger.isEnabledFor(logging.DEBUG):
             logger.debug(
-                f"RAGClient initialized with base_url: {self.base_url[:50]}...")
+                "RAGClient initialized with base_url: %s...", self.base_url[:50])
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        Exponential backoff before retry ``attempt + 1``, with jitter.
+
+        Randomizing the second half of each delay keeps workers that failed
+        together from hitting a recovering service again in lockstep.
+        """
+        delay = self.retry_delay * (2 ** (attempt - 1))
+        return random.uniform(delay / 2, delay)
 
     def _headers(self) -> Dict[str, str]:
         headers: Dict[str, str] = {"Content-Type": "application/json"}
@@ -122,7 +173,6 @@ class RAGClient:
 
         # Log exact payload for debugging (always, not just DEBUG level)
         try:
-            import json
             pretty_payload = json.dumps(payload, ensure_ascii=False, indent=2)
             logger.info(
                 "🔍 RAG search payload:\n%s\nURL: %s\nQuery params: %s",
@@ -175,7 +225,7 @@ class RAGClient:
                         pass
 
             if logger.isEnabledFor(logging.DEBUG):
-                logger.debug(f"RAG search returned {result_count} results")
+                logger.debug("RAG search returned %d results", result_count)
 
             return result
         except httpx.HTTPStatusError as e:
@@ -226,7 +276,7 @@ class RAGClient:
         url = f"{self.base_url}/knowledge/documents/ingest-url/"
 
         if logger.isEnabledFor(logging.DEBUG):
-            logger.debug(f"RAG ingest URL: {url_to_fetch}")
+            logger.debug("RAG ingest URL: %s", url_to_fetch)
 
         try:
             resp = await self._client.post(url, json=payload, headers=self._headers())
@@ -235,7 +285,7 @@ class RAGClient:
 
             if logger.isEnabledFor(logging.DEBUG):
                 doc_id = result.get("id") or result.get("document_id")
-                logger.debug(f"RAG ingest URL successful, doc_id: {doc_id}")
+                logger.debug("RAG ingest URL successful, doc_id: %s", doc_id)
 
             return result
         except httpx.HTTPStatusError as e:
@@ -278,7 +328,7 @@ class RAGClient:
 
         if logger.isEnabledFor(logging.DEBUG):
             logger.debug(
-                f"RAG ingest text: {title}, content length: {len(content)}")
+                "RAG ingest text: %s, content length: %d", title, len(content))
 
         try:
             resp = await self._client.post(url, json=payload, headers=self._headers())
@@ -287,7 +337,7 @@ class RAGClient:
 
             if logger.isEnabledFor(logging.DEBUG):
                 doc_id = result.get("id") or result.get("document_id")
-                logger.debug(f"RAG ingest text successful, doc_id: {doc_id}")
+                logger.debug("RAG ingest text successful, doc_id: %s", doc_id)
 
             return result
         except httpx.HTTPStatusError as e:
@@ -312,7 +362,7 @@ class RAGClient:
         url = f"{self.base_url}/knowledge/documents/{doc_id}/reprocess/"
 
         if logger.isEnabledFor(logging.DEBUG):
-            logger.debug(f"RAG reprocess document: {doc_id}")
+            logger.debug("RAG reprocess document: %s", doc_id)
 
         try:
             resp = await self._client.post(url, headers=self._headers())
@@ -368,31 +418,31 @@ class RAGClient:
 
         if logger.isEnabledFor(logging.DEBUG):
             logger.debug(
-                f"RAG ingest channel message: {title}, source_url: {source_url}")
+                "RAG ingest channel message: %s, source_url: %s", title, source_url)
 
         # Retry logic for connection errors
-        max_retries = int(os.getenv("RAG_MAX_RETRIES", "3"))
-        retry_delay = float(os.getenv("RAG_RETRY_DELAY", "1.0"))
+        max_retries = self.max_retries
         last_exception = None
+        # Encoded once; retries resend the same bytes.
+        body = _encode_json(payload)
+        headers = self._headers()
 
         for attempt in range(1, max_retries + 1):
             try:
-                resp = await self._client.post(url, json=payload, headers=self._headers())
+                resp = await self._client.post(url, content=body, headers=headers)
                 resp.raise_for_status()
                 result = resp.json()
 
                 if logger.isEnabledFor(logging.DEBUG):
                     doc_id = result.get("id") or result.get("document_id")
                     logger.debug(
-                        f"RAG ingest channel message successful, doc_id: {doc_id}")
+                        "RAG ingest channel message successful, doc_id: %s", doc_id)
 
                 return result
             except (httpx.ConnectError, httpx.NetworkError) as e:
                 last_exception = e
                 if attempt < max_retries:
-                    wait_time = retry_delay * \
-                        (2 ** (attempt - 1))  # Exponential backoff
-                    await asyncio.sleep(wait_time)
+                    await asyncio.sleep(self._backoff_delay(attempt))
                 else:
                     error_msg = f"Connection error during channel message ingest after {max_retries} attempts: {str(e)}"
                     logger.error(error_msg)
@@ -406,8 +456,7 @@ class RAGClient:
                 # Timeout errors are retried
                 last_exception = e
                 if attempt < max_retries:
-                    wait_time = retry_delay * (2 ** (attempt - 1))
-                    await asyncio.sleep(wait_time)
+                    await asyncio.sleep(self._backoff_delay(attempt))
                 else:
                     error_msg = f"Timeout during channel message ingest after {max_retries} attempts (timeout={self.timeout}s): {str(e)}"
                     logger.error(error_msg)
@@ -417,8 +466,7 @@ class RAGClient:
                 if isinstance(e, (httpx.ConnectError, httpx.NetworkError)):
                     last_exception = e
                     if attempt < max_retries:
-                        wait_time = retry_delay * (2 ** (attempt - 1))
-                        await asyncio.sleep(wait_time)
+                        await asyncio.sleep(self._backoff_delay(attempt))
                         continue
 
                 # Non-retryable request error or last attempt
@@ -426,7 +474,8 @@ class RAGClient:
                 logger.error(error_msg)
                 raise RAGServiceError(error_msg) from e
             except Exception as e:
-                # Unexpected errors are not retried
+                # Unexpected errors are not retried. Callers only log str() of
+                # the RAGServiceError, so keep the traceback of this rare path.
                 error_msg = f"Unexpected error during channel message ingest: {str(e)}"
                 logger.error(error_msg, exc_info=True)
                 raise RAGServiceError(error_msg) from e
@@ -436,6 +485,91 @@ class RAGClient:
             raise RAGServiceError(
                 f"All {max_retries} connection attempts failed") from last_exception
 
+    async def ingest_channel_messages_bulk(
+        self,
+        messages: List[Dict[str, Any]],
+        user_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Ingest several channel messages with a single request.
+
+        Args:
+            messages: One dict per message with the ingest_channel_message fields
+                (title, text_content, published_at, source_url, metadata)
+            user_id: Optional user ID (defaults to self.default_user_id)
+
+        Returns:
+            The ingestion results, normally one per message in the same order
+            as ``messages``; the service may return fewer
+
+        Raises:
+            BulkIngestUnsupportedError: If the RAG service has no bulk ingest endpoint
+        """
+        if time.monotonic() < self._bulk_ingest_unsupported_until:
+            raise BulkIngestUnsupportedError(
+                "Bulk ingest not supported by RAG service")
+
+        payload: Dict[str, Any] = {"documents": list(messages)}
+        final_user_id = user_id or self.default_user_id
+        if final_user_id:
+            payload["user_id"] = str(final_user_id)
+        if self.microservice:
+            payload["microservice"] = self.microservice
+
+        url = f"{self.base_url}/knowledge/documents/ingest-channel-messages/"
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("RAG bulk ingest of %d channel messages", len(messages))
+
+        body = _encode_json(payload)
+        headers = self._headers()
+        try:
+            # Only retry failures to connect: the request never reached the
+            # service, so resending cannot ingest the batch twice.
+            max_attempts = max(self.max_retries, 1)
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    resp = await self._client.post(url, content=body, headers=headers)
+                    break
+                except (httpx.ConnectError, httpx.ConnectTimeout):
+                    if attempt == max_attempts:
+                        raise
+                    await asyncio.sleep(self._backoff_delay(attempt))
+            if resp.status_code in (404, 405, 501):
+                self._bulk_ingest_unsupported_until = (
+                    time.monotonic() + _BULK_INGEST_REPROBE_INTERVAL)
+                logger.info(
+                    "RAG service has no bulk ingest endpoint (%s); "
+                    "ingesting channel messages one by one for %ss",
+                    resp.status_code,
+                    _BULK_INGEST_REPROBE_INTERVAL,
+                )
+                raise BulkIngestUnsupportedError(
+                    f"Bulk ingest not supported by RAG service ({resp.status_code})"
+                )
+            resp.raise_for_status()
+            result = resp.json()
+        except httpx.HTTPStatusError as e:
+            error_msg = f"Bulk ingest error {e.response.status_code}: {e.response.text[:200]}"
+            logger.error(error_msg)
+            raise RAGServiceError(error_msg) from e
+        except httpx.RequestError as e:
+            error_msg = f"Request error during bulk ingest: {str(e)}"
+            logger.error(error_msg)
+            raise RAGServiceError(error_msg) from e
+
+        items = result if isinstance(result, list) else (
+            result.get("results") or result.get("data") or [])
+        if len(items) != len(messages):
+            # The batch was accepted, so raising here would make the caller
+            # send it again; hand back what came and let it match them.
+            logger.warning(
+                "Bulk ingest returned %d results for %d messages",
+                len(items),
+                len(messages),
+            )
+        return items
+
     async def delete_document(self, doc_id: str) -> Dict[str, Any]:
         """
         Delete a document from the RAG system.
@@ -456,7 +590,7 @@ class RAGClient:
             params["microservice"] = self.microservice
 
         if logger.isEnabledFor(logging.DEBUG):
-            logger.debug(f"RAG delete document: {doc_id} with params {params}")
+            logger.debug("RAG delete document: %s with params %s", doc_id, params)
 
         try:
             resp = await self._client.delete(url, headers=self._headers(), params=params)
@@ -479,7 +613,50 @@ class RAGClient:
             logger.error(error_msg)
             raise RAGServiceError(error_msg) from e
 
-    # Sync wrapper methods for use in Celery tasks and sync contexts
+    async def delete_documents_bulk(self, doc_ids: List[str]) -> Dict[str, Any]:
+        """
+        Delete several documents from the RAG system with a single request.
+
+        Args:
+            doc_ids: Document IDs to delete (usually external_ids from RAG)
+
+        Returns:
+            Dictionary with delete result
+
+        Raises:
+            BulkDeleteUnsupportedError: If the RAG service has no bulk delete endpoint
+        """
+        url = f"{self.base_url}/knowledge/documents/bulk-delete/"
+
+        payload: Dict[str, Any] = {"ids": list(doc_ids)}
+        if self.default_user_id:
+            payload["user_id"] = str(self.default_user_id)
+        if self.microservice:
+            payload["microservice"] = self.microservice
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("RAG bulk delete of %d documents", len(doc_ids))
+
+        try:
+            resp = await self._client.post(url, json=payload, headers=self._headers())
+            if resp.status_code in (404, 405, 501):
+                raise BulkDeleteUnsupportedError(
+                    f"Bulk delete not supported by RAG service ({resp.status_code})"
+                )
+            resp.raise_for_status()
+            return resp.json() if resp.text else {"status": "ok"}
+        except httpx.HTTPStatusError as e:
+            error_msg = f"Bulk delete error {e.response.status_code}: {e.response.text[:200]}"
+            logger.error(error_msg)
+            raise RAGServiceError(error_msg) from e
+        except httpx.RequestError as e:
+            error_msg = f"Request error during bulk delete: {str(e)}"
+            logger.error(error_msg)
+            raise RAGServiceError(error_msg) from e
+
+    # Sync wrapper methods for use in Celery tasks and sync contexts.
+    # All of them run on the process-wide background loop so the underlying
+    # httpx connection pool survives across calls.
     def search_sync(
         self,
         query: str,
@@ -489,27 +666,9 @@ class RAGClient:
         user_id: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Synchronous wrapper for search method."""
-        import asyncio
-        from concurrent.futures import ThreadPoolExecutor
-
-        def run_in_thread():
-            # Create a new event loop in this thread to avoid conflicts
-            # with Celery's fork-based workers and anyio initialization issues
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                return loop.run_until_complete(
-                    self.search(query, top_k, filters,
-                                metadata_filter, user_id)
-                )
-            finally:
-                loop.close()
-
-        # Use a thread pool executor to isolate the async code
-        # This prevents anyio/httpx issues in Celery fork workers
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(run_in_thread)
-            return future.result()
+        return run_sync(
+            self.search(query, top_k, filters, metadata_filter, user_id)
+        )
 
     def ingest_url_sync(
         self,
@@ -518,22 +677,7 @@ class RAGClient:
         user_id: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Synchronous wrapper for ingest_url method."""
-        import asyncio
-        from concurrent.futures import ThreadPoolExecutor
-
-        def run_in_thread():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                return loop.run_until_complete(
-                    self.ingest_url(url_to_fetch, metadata, user_id)
-                )
-            finally:
-                loop.close()
-
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(run_in_thread)
-            return future.result()
+        return run_sync(self.ingest_url(url_to_fetch, metadata, user_id))
 
     def ingest_text_sync(
         self,
@@ -543,22 +687,7 @@ class RAGClient:
         user_id: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Synchronous wrapper for ingest_text method."""
-        import asyncio
-        from concurrent.futures import ThreadPoolExecutor
-
-        def run_in_thread():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                return loop.run_until_complete(
-                    self.ingest_text(title, content, metadata, user_id)
-                )
-            finally:
-                loop.close()
-
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(run_in_thread)
-            return future.result()
+        return run_sync(self.ingest_text(title, content, metadata, user_id))
 
     def ingest_channel_message_sync(
         self,
@@ -570,59 +699,36 @@ class RAGClient:
         user_id: Optional[str] = None,
     ) -> Dict[str, Any]:
         """Synchronous wrapper for ingest_channel_message method."""
-        import asyncio
-        from concurrent.futures import ThreadPoolExecutor
-
-        def run_in_thread():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                return loop.run_until_complete(
-                    self.ingest_channel_message(
-                        title, text_content, published_at, source_url, metadata, user_id
-                    )
-                )
-            finally:
-                loop.close()
+        return run_sync(
+            self.ingest_channel_message(
+                title, text_content, published_at, source_url, metadata, user_id
+            )
+        )
 
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(run_in_thread)
-            return future.result()
+    def ingest_channel_messages_bulk_sync(
+        self,
+        messages: List[Dict[str, Any]],
+        user_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Synchronous wrapper for ingest_channel_messages_bulk method."""
+        return run_sync(self.ingest_channel_messages_bulk(messages, user_id))
 
     def reprocess_document_sync(self, doc_id: str) -> Dict[str, Any]:
         """Synchronous wrapper for reprocess_document method."""
-        import asyncio
-        from concurrent.futures import ThreadPoolExecutor
-
-        def run_in_thread():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                return loop.run_until_complete(self.reprocess_document(doc_id))
-            finally:
-                loop.close()
-
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(run_in_thread)
-            return future.result()
+        return run_sync(self.reprocess_document(doc_id))
 
     def delete_document_sync(self, doc_id: str) -> Dict[str, Any]:
         """Synchronous wrapper for delete_document method."""
-        import asyncio
-        from concurrent.futures import ThreadPoolExecutor
+        return run_sync(self.delete_document(doc_id))
 
-        def run_in_thread():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                return loop.run_until_complete(self.delete_document(doc_id))
-            finally:
-                loop.close()
-
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(run_in_thread)
-            return future.result()
+    def delete_documents_bulk_sync(self, doc_ids: List[str]) -> Dict[str, Any]:
+        """Synchronous wrapper for delete_documents_bulk method."""
+        return run_sync(self.delete_documents_bulk(doc_ids))
 
     async def close(self):
         """Close the HTTP client."""
         await self._client.aclose()
+
+    def close_sync(self) -> None:
+        """Synchronous wrapper for close method."""
+        run_sync(self.close())
@@ -3,18 +3,157 @@ Celery tasks for background processing.
 """
 import logging
 import asyncio
+from typing import TYPE_CHECKING, Optional
 from celery import shared_task
-from django.core.cache import cache
+from celery.signals import worker_process_init, worker_process_shutdown
 from django.conf import settings
-from telegram import Bot
+from django.db.models import Exists, OuterRef
 from .models import KnowledgeDocument, UserProfile, ChatSession
 from .services.rag_client import RAGClient
-from .exceptions import RAGServiceError
+from .services.event_loop import get_background_loop, run_sync, shutdown_background_loop
+
+if TYPE_CHECKING:
+    from telegram import Bot
 
 logger = logging.getLogger(__name__)
 
+# One RAGClient per worker process, so its HTTP connection pool (and TLS
+# sessions) are reused across tasks instead of being rebuilt for every task.
+_RAG_CLIENT: Optional[RAGClient] = None
+
+
+def _get_rag_client() -> RAGClient:
+    """Return the worker's shared RAGClient, creating it on first use."""
+    global _RAG_CLIENT
+    if _RAG_CLIENT is None:
+        _RAG_CLIENT = RAGClient()
+    return _RAG_CLIENT
+
+
+# Keys the RAG service may use for the created document's ID, in lookup order.
+_EXTERNAL_ID_KEYS = ("id", "document_id", "external_id")
+# The RAG service always answers with the same shape, so remember which key
+# matched last and try it first next time.
+_external_id_key: str = _EXTERNAL_ID_KEYS[0]
+
+
+def _extract_external_id(result: dict):
+    """Return the document ID from a RAG ingest response, or None if missing."""
+    global _external_id_key
+    external_id = result.get(_external_id_key)
+    if external_id:
+        return external_id
+    for key in _EXTERNAL_ID_KEYS:
+        external_id = result.get(key)
+        if external_id:
+            _external_id_key = key
+            return external_id
+    return None
+
+
+@worker_process_init.connect
+def _init_rag_client(**kwargs) -> None:
+    """Create the shared RAGClient and background loop when a worker process starts."""
+    global _RAG_CLIENT
+    # Never reuse a client inherited from the parent process across fork.
+    _RAG_CLIENT = None
+    # Connected only now, after every task module connected its own shutdown
+    # handlers, so the loop outlives the clients those handlers close on it.
+    worker_process_shutdown.connect(
+        _stop_background_loop, dispatch_uid="core.tasks._stop_background_loop")
+    try:
+        # Start the loop every run_sync() call uses now, not inside the first task.
+        get_background_loop()
+        _get_rag_client()
+    except Exception as e:
+        logger.warning(
+            "RAGClient initialization failed at worker start; will retry lazily: %s", e)
+
+
+def _stop_background_loop(**kwargs) -> None:
+    """Stop the background loop and its executor when a worker process exits."""
+    try:
+        shutdown_background_loop()
+    except Exception as e:
+        logger.warning("Failed to stop background event loop: %s", e)
+
+
+@worker_process_shutdown.connect
+def _close_rag_client(**kwargs) -> None:
+    """Close the shared RAGClient's connection pool when a worker process exits."""
+    global _RAG_CLIENT
+    if _RAG_CLIENT is None:
+        return
+    try:
+        _RAG_CLIENT.close_sync()
+    except Exception as e:
+        logger.warning("Failed to close shared RAGClient: %s", e)
+    finally:
+        _RAG_CLIENT = None
+
+
+# One Telegram Bot per worker process for broadcasts. Its httpx pool is bound to
+# the background event loop, so it must only be used from coroutines run there.
+_BOT: Optional["Bot"] = None
+
+
+async def _get_bot() -> "Bot":
+    """Return the worker's shared Bot, creating it on first use."""
+    global _BOT
+    if _BOT is None:
+        # Imported lazily: python-telegram-bot is only needed by broadcasts, so
+        # workers that never broadcast skip loading it at fork time.
+        from telegram import Bot
+        from telegram.request import HTTPXRequest
+
+        bot = Bot(
+            token=settings.TELEGRAM_BOT_TOKEN,
+            request=HTTPXRequest(connection_pool_size=32, pool_timeout=10.0),
+        )
+        await bot.initialize()
+        _BOT = bot
+    return _BOT
+
+
+@worker_process_shutdown.connect
+def _close_bot(**kwargs) -> None:
+    """Shut down the shared Bot's HTTP client when a worker process exits."""
+    global _BOT
+    if _BOT is None:
+        return
+    try:
+        run_sync(_BOT.shutdown())
+    except Exception as e:
+        logger.warning("Failed to shut down shared Telegram Bot: %s", e)
+    finally:
+        _BOT = None
+
 
-@shared_task(bind=True, max_retries=3)
+def _document_metadata(doc: KnowledgeDocument) -> dict:
+    """Build the metadata sent to RAG along with a KnowledgeDocument."""
+    return {
+        "title": doc.title,
+        "django_id": str(doc.id),
+        **(doc.metadata or {})
+    }
+
+
+# Maximum number of RAG ingest requests in flight during a bulk push.
+_BULK_PUSH_CONCURRENCY = 8
+
+# Retry policy shared by the RAG tasks. RAG errors and unexpected failures are
+# both retried, with exponential backoff starting at 60s, capped at 10 minutes,
+# and jittered so a RAG outage does not produce synchronized retry storms.
+_RAG_RETRY_OPTIONS = {
+    "autoretry_for": (Exception,),
+    "max_retries": 3,
+    "retry_backoff": 60,
+    "retry_backoff_max": 600,
+    "retry_jitter": True,
+}
+
+
+@shared_task(bind=True, **_RAG_RETRY_OPTIONS)
 def push_document_to_rag(self, document_id: int) -> dict:
     """
     Push a KnowledgeDocument to RAG service asynchronously.
@@ -27,74 +166,136 @@ def push_document_to_rag(self, document_id: int) -> dict:
     """
     try:
         doc = KnowledgeDocument.objects.get(id=document_id)
-        client = RAGClient()
+    except KnowledgeDocument.DoesNotExist:
+        error_msg = f"Document with ID {document_id} not found"
+        logger.error(error_msg)
+        return {"status": "error", "error": error_msg}
 
-        metadata = {
-            "title": doc.title,
-            "django_id": str(doc.id),
-            **(doc.metadata or {})
-        }
+    client = _get_rag_client()
 
-        if doc.source_url:
-            result = client.ingest_url_sync(
-                url_to_fetch=doc.source_url,
-                metadata=metadata,
-            )
-        else:
-            result = client.ingest_text_sync(
+    metadata = _document_metadata(doc)
+
+    if doc.source_url:
+        result = client.ingest_url_sync(
+            url_to_fetch=doc.source_url,
+            metadata=metadata,
+        )
+    else:
+        result = client.ingest_text_sync(
+            title=doc.title,
+            content=doc.content,
+            metadata=metadata,
+        )
+
+    # Extract external_id from RAG response
+    external_id = _extract_external_id(result)
+
+    # Update document with a single UPDATE; this bypasses save() and the
+    # pre/post_save signals, which must not re-enqueue RAG work here.
+    updates = {"indexed_in_rag": True}
+    if external_id:
+        updates["external_id"] = str(external_id)
+
+    KnowledgeDocument.objects.filter(pk=doc.pk).update(**updates)
+
+    logger.info(
+        f"Successfully pushed document '{doc.title}' (ID: {document_id}) to RAG. "
+        f"External ID: {external_id}"
+    )
+
+    return {
+        "status": "success",
+        "document_id": document_id,
+        "external_id": external_id,
+        "title": doc.title
+    }
+
+
+@shared_task
+def push_documents_to_rag_bulk(document_ids: list[int]) -> dict:
+    """
+    Push several KnowledgeDocuments to RAG service in one task.
+
+    All documents are loaded with a single query, ingested concurrently over the
+    shared RAGClient and marked as indexed with a single bulk UPDATE. Documents
+    whose ingest fails are re-queued individually through push_document_to_rag,
+    so they still get its retry policy.
+
+    Args:
+        document_ids: IDs of the KnowledgeDocuments to push
+
+    Returns:
+        Dictionary with result statistics
+    """
+    docs = list(
+        KnowledgeDocument.objects.filter(id__in=document_ids).only(
+            "id", "title", "content", "source_url", "metadata", "external_id"
+        )
+    )
+    if not docs:
+        return {"status": "no_documents", "count": 0}
+
+    client = _get_rag_client()
+
+    async def _push_one(doc: KnowledgeDocument, semaphore: asyncio.Semaphore) -> dict:
+        async with semaphore:
+            metadata = _document_metadata(doc)
+            if doc.source_url:
+                return await client.ingest_url(
+                    url_to_fetch=doc.source_url,
+                    metadata=metadata,
+                )
+            return await client.ingest_text(
                 title=doc.title,
                 content=doc.content,
                 metadata=metadata,
             )
 
-        # Extract external_id from RAG response
-        external_id = (
-            result.get("id")
-            or result.get("document_id")
-            or result.get("external_id")
+    async def _push_all() -> list:
+        semaphore = asyncio.Semaphore(_BULK_PUSH_CONCURRENCY)
+        return await asyncio.gather(
+            *(_push_one(doc, semaphore) for doc in docs),
+            return_exceptions=True,
         )
 
-        # Update document
-        update_fields = ["indexed_in_rag"]
+    results = run_sync(_push_all())
+
+    pushed = []
+    failed_ids = []
+    for doc, result in zip(docs, results):
+        if isinstance(result, BaseException):
+            logger.error(
+                "Error pushing document %s to RAG in bulk: %s", doc.id, result)
+            failed_ids.append(doc.id)
+            continue
+        external_id = _extract_external_id(result)
         if external_id:
             doc.external_id = str(external_id)
-            update_fields.append("external_id")
-
         doc.indexed_in_rag = True
-        doc.save(update_fields=update_fields)
+        pushed.append(doc)
 
-        logger.info(
-            f"Successfully pushed document '{doc.title}' (ID: {document_id}) to RAG. "
-            f"External ID: {external_id}"
-        )
+    if pushed:
+        KnowledgeDocument.objects.bulk_update(
+            pushed, ["external_id", "indexed_in_rag"])
 
-        return {
-            "status": "success",
-            "document_id": document_id,
-            "external_id": external_id,
-            "title": doc.title
-        }
+    for doc_id in failed_ids:
+        push_document_to_rag.delay(doc_id)
 
-    except KnowledgeDocument.DoesNotExist:
-        error_msg = f"Document with ID {document_id} not found"
-        logger.error(error_msg)
-        return {"status": "error", "error": error_msg}
-
-    except RAGServiceError as e:
-        error_msg = f"RAG client error: {str(e)}"
-        logger.error(
-            f"Error pushing document {document_id} to RAG: {error_msg}")
-        # Retry with exponential backoff
-        raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
-
-    except Exception as e:
-        error_msg = f"Unexpected error: {str(e)}"
-        logger.exception(
-            f"Unexpected error pushing document {document_id} to RAG: {error_msg}")
-        raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
+    logger.info(
+        "Bulk RAG push completed. Pushed: %d, Re-queued: %d, Missing: %d",
+        len(pushed),
+        len(failed_ids),
+        len(document_ids) - len(docs),
+    )
+    return {
+        "status": "success",
+        "total": len(document_ids),
+        "pushed": len(pushed),
+        "requeued": len(failed_ids),
+    }
 
 
-@shared_task(bind=True, max_retries=3)
+@shared_task(bind=True, **_RAG_RETRY_OPTIONS)
 def reprocess_document_in_rag(self, document_id: int) -> dict:
     """
     Reprocess a document in RAG service asynchronously.
@@ -107,44 +308,32 @@ def reprocess_document_in_rag(self, document_id: int) -> dict:
     """
     try:
         doc = KnowledgeDocument.objects.get(id=document_id)
-        client = RAGClient()
-
-        # Use external_id if available, otherwise fall back to Django ID
-        doc_id = doc.external_id or str(doc.id)
-
-        client.reprocess_document_sync(doc_id=doc_id)
-
-        logger.info(
-            f"Successfully reprocessed document '{doc.title}' (ID: {document_id}) in RAG. "
-            f"Used doc_id: {doc_id}"
-        )
-
-        return {
-            "status": "success",
-            "document_id": document_id,
-            "rag_doc_id": doc_id,
-            "title": doc.title
-        }
-
     except KnowledgeDocument.DoesNotExist:
         error_msg = f"Document with ID {document_id} not found"
         logger.error(error_msg)
         return {"status": "error", "error": error_msg}
 
-    except RAGServiceError as e:
-        error_msg = f"RAG client error: {str(e)}"
-        logger.error(
-            f"Error reprocessing document {document_id} in RAG: {error_msg}")
-        raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
+    client = _get_rag_client()
 
-    except Exception as e:
-        error_msg = f"Unexpected error: {str(e)}"
-        logger.exception(
-            f"Unexpected error reprocessing document {document_id}: {error_msg}")
-        raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
+    # Use external_id if available, otherwise fall back to Django ID
+    doc_id = doc.external_id or str(doc.id)
+
+    client.reprocess_document_sync(doc_id=doc_id)
 
+    logger.info(
+        f"Successfully reprocessed document '{doc.title}' (ID: {document_id}) in RAG. "
+        f"Used doc_id: {doc_id}"
+    )
 
-@shared_task(bind=True, max_retries=3)
+    return {
+        "status": "success",
+        "document_id": document_id,
+        "rag_doc_id": doc_id,
+        "title": doc.title
+    }
+
+
+@shared_task(bind=True, **_RAG_RETRY_OPTIONS)
 def delete_document_from_rag(self, external_id: str) -> dict:
     """
     Delete a document from RAG service asynchronously.
@@ -155,32 +344,17 @@ def delete_document_from_rag(self, external_id: str) -> dict:
     Returns:
         Dictionary with result status
     """
-    try:
-        client = RAGClient()
-        client.delete_document_sync(doc_id=external_id)
-
-        logger.info(
-            f"Successfully deleted document with external_id={external_id} from RAG."
-        )
+    client = _get_rag_client()
+    client.delete_document_sync(doc_id=external_id)
 
-        return {
-            "status": "success",
-            "external_id": external_id,
-        }
+    logger.info(
+        f"Successfully deleted document with external_id={external_id} from RAG."
+    )
 
-    except RAGServiceError as e:
-        error_msg = f"RAG client error: {str(e)}"
-        logger.error(
-            f"Error deleting document {external_id} from RAG: {error_msg}"
-        )
-        raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
-
-    except Exception as e:
-        error_msg = f"Unexpected error: {str(e)}"
-        logger.exception(
-            f"Unexpected error deleting document {external_id} from RAG: {error_msg}"
-        )
-        raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
+    return {
+        "status": "success",
+        "external_id": external_id,
+    }
 
 
 @shared_task
@@ -234,13 +408,19 @@ def broadcast_message_task(message_text: str, segment: str = "all", days: int =
     if segment == "new" and days > 0:
         cutoff = timezone.now() - timedelta(days=days)
         users = users.filter(created_at__gte=cutoff)
-    elif segment == "active" and days > 0:
+    elif segment in ("active", "inactive") and days > 0:
         cutoff = timezone.now() - timedelta(days=days)
-        users = users.filter(sessions__updated_at__gte=cutoff).distinct()
-    elif segment == "inactive" and days > 0:
-        cutoff = timezone.now() - timedelta(days=days)
-        # Users who do NOT have any session updated since cutoff
-        users = users.exclude(sessions__updated_at__gte=cutoff)
+        # EXISTS stops at the first recent session per user and needs no
+        # JOIN + DISTINCT over the sessions table.
+        recent_sessions = ChatSession.objects.filter(
+            user_profile=OuterRef("pk"),
+            updated_at__gte=cutoff,
+        )
+        if segment == "active":
+            users = users.filter(Exists(recent_sessions))
+        else:
+            # Users who do NOT have any session updated since cutoff
+            users = users.filter(~Exists(recent_sessions))
 
     user_ids = list(users.values_list("telegram_id", flat=True))
     total_users = len(user_ids)
@@ -249,7 +429,7 @@ def broadcast_message_task(message_text: str, segment: str = "all", days: int =
         return {"status": "no_users", "count": 0}
 
     async def _send_all():
-        bot = Bot(token=settings.TELEGRAM_BOT_TOKEN)
+        bot = await _get_bot()
         success = 0
         failed = 0
         for user_id in user_ids:
@@ -263,25 +443,8 @@ def broadcast_message_task(message_text: str, segment: str = "all", days: int =
         return success, failed
 
     try:
-        # Check if there is an existing event loop
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = None
-
-        if loop and loop.is_running():
-            # If loop is running, we can't use run_until_complete easily without nesting issues
-            pass
-
-        # Use asyncio.run() which handles loop creation/cleanup
-        try:
-            success, failed = asyncio.run(_send_all())
-        except RuntimeError:
-            # Fallback for when loop exists (e.g. if celery worker has loop)
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            success, failed = loop.run_until_complete(_send_all())
-            loop.close()
+        # Run on the background loop the shared Bot is bound to
+        success, failed = run_sync(_send_all())
 
         logger.info(f"Broadcast completed. Success: {success}, Failed: {failed}")
         return {
@@ -17,20 +17,17 @@ After successful authorization, the session file will be saved and you can
 restart your Celery worker.
 """
 from telethon import TelegramClient
-from django.conf import settings
+from decouple import config
 import os
 import sys
-import django
 import asyncio
 
-# Setup Django environment
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sharif_assistant.settings")
-django.setup()
-
 
 async def main():
-    api_id = settings.TELEGRAM_API_ID
-    api_hash = settings.TELEGRAM_API_HASH
+    # Read credentials straight from the environment / .env file, the same way
+    # sharif_assistant/settings.py does, without paying for django.setup().
+    api_id = config("TELEGRAM_API_ID", default=None, cast=int)
+    api_hash = config("TELEGRAM_API_HASH", default=None)
 
     # Create sessions directory if it doesn't exist
     sessions_dir = os.path.join(os.path.dirname(__file__), "sessions")
@@ -1,14 +1,35 @@
 from django.contrib import admin
+from django.db.models import Count
 from .models import MonitoredChannel, IngestedTelegramMessage
 
 @admin.register(MonitoredChannel)
 class MonitoredChannelAdmin(admin.ModelAdmin):
     """Admin interface for managing MonitoredChannel models."""
-    list_display = ('username', 'added_at')
+    list_display = ('username', 'added_at', 'message_count')
     search_fields = ('username',)
     list_filter = ('added_at',)
     ordering = ('-added_at',)
 
+    def get_queryset(self, request):
+        # Count messages in the changelist query instead of once per row.
+        return super().get_queryset(request).annotate(msg_count=Count('messages'))
+
+    @admin.display(description='Messages', ordering='msg_count')
+    def message_count(self, obj):
+        return obj.msg_count
+
+    def save_model(self, request, obj, form, change):
+        # A cached peer belongs to the old username; resolve the new one afresh.
+        if change and 'username' in form.changed_data:
+            obj.channel_id = None
+            obj.access_hash = None
+        if change and 'rag_message_count' in form.changed_data:
+            # The form already wrote the new count; apply it over the old one.
+            count = obj.rag_message_count
+            obj.rag_message_count = form.initial.get('rag_message_count')
+            obj.set_rag_message_count(count)
+        super().save_model(request, obj, form, change)
+
 
 @admin.register(IngestedTelegramMessage)
 class IngestedTelegramMessageAdmin(admin.ModelAdmin):
@@ -24,3 +45,6 @@ class IngestedTelegramMessageAdmin(admin.ModelAdmin):
     search_fields = ("external_id", "channel_username")
     list_filter = ("ingested", "channel_username")
     ordering = ("-created_at",)
+    list_per_page = 50
+    # Skip the unfiltered COUNT(*) over the whole table on every changelist load.
+    show_full_result_count = False
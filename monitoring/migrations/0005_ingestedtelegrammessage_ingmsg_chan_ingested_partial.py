@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0004_rename_monitoring_ing_chan_msg_idx_monitoring__channel_a169e9_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="ingestedtelegrammessage",
+            index=models.Index(
+                condition=models.Q(("ingested", True)),
+                fields=["channel_username"],
+                name="ingmsg_chan_ingested_partial",
+            ),
+        ),
+    ]
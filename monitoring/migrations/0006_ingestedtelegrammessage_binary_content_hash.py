@@ -0,0 +1,85 @@
+# Generated by Django 6.0 on 2026-10-16
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def hex_to_digest(apps, schema_editor):
+    IngestedTelegramMessage = apps.get_model("monitoring", "IngestedTelegramMessage")
+    batch = []
+    rows = (
+        IngestedTelegramMessage.objects.exclude(content_hash__isnull=True)
+        .exclude(content_hash="")
+        .only("id", "content_hash")
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    for row in rows:
+        row.content_digest = bytes.fromhex(row.content_hash)
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            IngestedTelegramMessage.objects.bulk_update(batch, ["content_digest"])
+            batch = []
+    if batch:
+        IngestedTelegramMessage.objects.bulk_update(batch, ["content_digest"])
+
+
+def digest_to_hex(apps, schema_editor):
+    IngestedTelegramMessage = apps.get_model("monitoring", "IngestedTelegramMessage")
+    batch = []
+    rows = (
+        IngestedTelegramMessage.objects.exclude(content_digest__isnull=True)
+        .only("id", "content_digest")
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    for row in rows:
+        row.content_hash = bytes(row.content_digest).hex()
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            IngestedTelegramMessage.objects.bulk_update(batch, ["content_hash"])
+            batch = []
+    if batch:
+        IngestedTelegramMessage.objects.bulk_update(batch, ["content_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0005_ingestedtelegrammessage_ingmsg_chan_ingested_partial"),
+    ]
+
+    operations = [
+        # Casting varchar -> bytea in place would store the hex text itself,
+        # so copy decoded digests into a new column and swap it in.
+        migrations.AddField(
+            model_name="ingestedtelegrammessage",
+            name="content_digest",
+            field=models.BinaryField(blank=True, max_length=32, null=True),
+        ),
+        migrations.RunPython(hex_to_digest, digest_to_hex),
+        migrations.RemoveIndex(
+            model_name="ingestedtelegrammessage",
+            name="monitoring__content_eececf_idx",
+        ),
+        migrations.RemoveField(
+            model_name="ingestedtelegrammessage",
+            name="content_hash",
+        ),
+        migrations.RenameField(
+            model_name="ingestedtelegrammessage",
+            old_name="content_digest",
+            new_name="content_hash",
+        ),
+        migrations.AlterField(
+            model_name="ingestedtelegrammessage",
+            name="content_hash",
+            field=models.BinaryField(blank=True, db_index=True, max_length=32, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="ingestedtelegrammessage",
+            index=models.Index(
+                fields=["content_hash", "ingested"],
+                name="monitoring__content_eececf_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-16
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0006_ingestedtelegrammessage_binary_content_hash"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="ingestedtelegrammessage",
+            name="created_at",
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def link_channels(apps, schema_editor):
+    MonitoredChannel = apps.get_model("monitoring", "MonitoredChannel")
+    IngestedTelegramMessage = apps.get_model("monitoring", "IngestedTelegramMessage")
+    for channel in MonitoredChannel.objects.only("id", "username").iterator():
+        IngestedTelegramMessage.objects.filter(
+            channel_username=channel.username, channel__isnull=True
+        ).update(channel=channel)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0007_alter_ingestedtelegrammessage_created_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ingestedtelegrammessage",
+            name="channel",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="messages",
+                to="monitoring.monitoredchannel",
+            ),
+        ),
+        migrations.RunPython(link_channels, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0008_ingestedtelegrammessage_channel"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="ingestedtelegrammessage",
+            name="content_hash",
+            field=models.BinaryField(blank=True, max_length=32, null=True),
+        ),
+        migrations.AlterField(
+            model_name="ingestedtelegrammessage",
+            name="rag_document_id",
+            field=models.CharField(
+                blank=True,
+                help_text="Document ID in RAG knowledge base (for deletion/reprocess)",
+                max_length=255,
+                null=True,
+            ),
+        ),
+    ]
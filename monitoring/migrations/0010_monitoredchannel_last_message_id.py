@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-16
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def seed_last_message_id(apps, schema_editor):
+    # Start each watermark at the newest ingested message, which is where
+    # harvests resumed before, instead of re-scanning every channel's window.
+    MonitoredChannel = apps.get_model("monitoring", "MonitoredChannel")
+    IngestedTelegramMessage = apps.get_model("monitoring", "IngestedTelegramMessage")
+    last_ingested = (
+        IngestedTelegramMessage.objects.filter(ingested=True)
+        .values("channel_username")
+        .annotate(last_message_id=Max("message_id"))
+    )
+    for row in last_ingested:
+        MonitoredChannel.objects.filter(username=row["channel_username"]).update(
+            last_message_id=row["last_message_id"]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0009_drop_redundant_ingestedtelegrammessage_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="monitoredchannel",
+            name="last_message_id",
+            field=models.BigIntegerField(
+                default=0,
+                help_text=(
+                    "Highest message ID seen by the last complete harvest; older history "
+                    "is not fetched again. Raising the message count resets it to 0 so "
+                    "the larger window is backfilled."
+                ),
+            ),
+        ),
+        migrations.RunPython(seed_last_message_id, migrations.RunPython.noop),
+    ]
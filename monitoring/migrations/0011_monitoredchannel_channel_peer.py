@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("monitoring", "0010_monitoredchannel_last_message_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="monitoredchannel",
+            name="channel_id",
+            field=models.BigIntegerField(
+                blank=True,
+                help_text="Telegram channel ID resolved from the username.",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="monitoredchannel",
+            name="access_hash",
+            field=models.BigIntegerField(
+                blank=True,
+                help_text="Telegram access hash resolved from the username.",
+                null=True,
+            ),
+        ),
+    ]
@@ -17,10 +17,41 @@ class MonitoredChannel(models.Model):
         default=100,
         help_text="The number of recent messages to process for RAG."
     )
+    last_message_id = models.BigIntegerField(
+        default=0,
+        help_text=(
+            "Highest message ID seen by the last complete harvest; older history "
+            "is not fetched again. Raising the message count resets it to 0 so "
+            "the larger window is backfilled."
+        )
+    )
+    # Resolved InputPeerChannel, so harvests skip a ResolveUsername RPC.
+    channel_id = models.BigIntegerField(
+        blank=True,
+        null=True,
+        help_text="Telegram channel ID resolved from the username."
+    )
+    access_hash = models.BigIntegerField(
+        blank=True,
+        null=True,
+        help_text="Telegram access hash resolved from the username."
+    )
 
     def __str__(self):
         return f"@{self.username}"
 
+    def set_rag_message_count(self, count):
+        """
+        Set the number of messages to process, resetting the watermark when it grows.
+
+        History below ``last_message_id`` is never fetched again, so a larger
+        window has to start over to backfill the older messages.
+        """
+        # A count of 0 means no limit.
+        if (count or float('inf')) > (self.rag_message_count or float('inf')):
+            self.last_message_id = 0
+        self.rag_message_count = count
+
     class Meta:
         verbose_name = "Monitored Channel"
         verbose_name_plural = "Monitored Channels"
@@ -36,6 +67,13 @@ class IngestedTelegramMessage(models.Model):
     """
 
     external_id = models.CharField(max_length=255, unique=True, db_index=True)
+    channel = models.ForeignKey(
+        MonitoredChannel,
+        on_delete=models.CASCADE,
+        related_name="messages",
+        blank=True,
+        null=True,
+    )
     channel_username = models.CharField(max_length=100, db_index=True)
     message_id = models.BigIntegerField(db_index=True)
     source_url = models.URLField(blank=True, null=True)
@@ -43,11 +81,11 @@ class IngestedTelegramMessage(models.Model):
         max_length=255,
         blank=True,
         null=True,
-        db_index=True,
         help_text="Document ID in RAG knowledge base (for deletion/reprocess)",
     )
-    content_hash = models.CharField(
-        max_length=64, blank=True, null=True, db_index=True)
+    # Raw SHA-256 digest of the normalized text (32 bytes, half the size of hex).
+    # Lookups are served by the (content_hash, ingested) index below.
+    content_hash = models.BinaryField(max_length=32, blank=True, null=True)
 
     ingested = models.BooleanField(default=False, db_index=True)
     attempts = models.PositiveIntegerField(default=0)
@@ -55,7 +93,7 @@ class IngestedTelegramMessage(models.Model):
     ingested_at = models.DateTimeField(blank=True, null=True)
     last_error = models.TextField(blank=True, null=True)
 
-    created_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -63,6 +101,13 @@ class IngestedTelegramMessage(models.Model):
         indexes = [
             models.Index(fields=["channel_username", "message_id"]),
             models.Index(fields=["content_hash", "ingested"]),
+            # Serves channel cleanup (channel_username=..., ingested=True)
+            # without touching rows that were never ingested.
+            models.Index(
+                fields=["channel_username"],
+                condition=models.Q(ingested=True),
+                name="ingmsg_chan_ingested_partial",
+            ),
         ]
 
     def __str__(self) -> str:
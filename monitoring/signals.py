@@ -1,22 +1,76 @@
+import itertools
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Iterable
 
+from django.db import router
 from django.db.models.signals import pre_delete
 from django.dispatch import receiver
 
 from .models import MonitoredChannel, IngestedTelegramMessage
 from core.services.rag_client import RAGClient
-from core.exceptions import RAGServiceError
+from core.exceptions import RAGServiceError, BulkDeleteUnsupportedError
 
 logger = logging.getLogger(__name__)
 
 
-def _delete_rag_documents(doc_ids: Iterable[str]) -> None:
+# IngestedTelegramMessage rows can be removed with QuerySet._raw_delete() only
+# while nothing references the model (reverse FKs, M2Ms, GenericRelations);
+# otherwise we must let Django's collector handle cascades.
+_RAW_DELETE_SAFE = not any(
+    field.auto_created and not field.concrete
+    for field in IngestedTelegramMessage._meta.get_fields(include_hidden=True)
+)
+
+# Maximum number of document IDs sent in one bulk delete request.
+_BULK_DELETE_CHUNK_SIZE = 500
+
+# Rows fetched per round-trip while streaming a channel's document IDs
+# (server-side cursor on PostgreSQL), bounding memory for huge channels.
+_DOC_ID_FETCH_SIZE = 5000
+
+
+# Maximum number of per-document DELETE requests in flight at once.
+_DELETE_WORKERS = 16
+
+
+def _delete_rag_documents_one_by_one(client: RAGClient, doc_ids: Iterable[str]) -> None:
+    """
+    Delete documents with one request each (fallback when bulk delete is unavailable).
+
+    Requests are dispatched from a small thread pool so their round-trips overlap;
+    they all share the client's connection pool on the background event loop.
+    """
+    with ThreadPoolExecutor(max_workers=_DELETE_WORKERS) as executor:
+        futures = {
+            executor.submit(client.delete_document_sync, doc_id): doc_id
+            for doc_id in doc_ids
+        }
+        for future in as_completed(futures):
+            doc_id = futures[future]
+            try:
+                future.result()
+                logger.debug("Successfully deleted RAG document %s", doc_id)
+            except RAGServiceError as e:
+                # RAGClient already handles 404 as success, so this is for other errors
+                logger.warning("Failed to delete RAG document %s: %s", doc_id, e)
+            except Exception as e:
+                logger.warning(
+                    "Unexpected error deleting RAG document %s: %s", doc_id, e
+                )
+
+
+def _delete_rag_documents(doc_ids: Iterable[str]) -> int:
     """
     Best-effort deletion of documents from the RAG service.
 
-    Uses RAGClient to delete documents. Failures are logged but do not block channel deletion.
-    Handles sync/async context issues properly by using a new event loop for each call.
+    Documents are deleted in chunks of _BULK_DELETE_CHUNK_SIZE with one bulk
+    request per chunk; if the RAG service has no bulk endpoint we fall back to
+    one request per document. Failures are logged but do not block channel deletion.
+    The sync wrappers run on the shared background event loop, so they are safe to
+    call from signal handlers.
+
+    Returns the number of document IDs consumed from ``doc_ids``.
     """
     try:
         client = RAGClient()
@@ -24,33 +78,36 @@ def _delete_rag_documents(doc_ids: Iterable[str]) -> None:
         logger.warning(
             "RAGClient initialization failed; skipping RAG deletions: %s", e
         )
-        return
-
-    # Use RAGClient's synchronous wrapper which handles event loop creation
-    for doc_id in doc_ids:
-        if not doc_id:
-            continue
-        try:
-            # delete_document_sync creates its own loop and thread, preventing
-            # "Event loop is closed" errors in signal handlers
-            client.delete_document_sync(doc_id)
-            logger.debug("Successfully deleted RAG document %s", doc_id)
-        except RAGServiceError as e:
-            # RAGClient already handles 404 as success, so this is for other errors
-            logger.warning("Failed to delete RAG document %s: %s", doc_id, e)
-        except Exception as e:
-            logger.warning(
-                "Unexpected error deleting RAG document %s: %s", doc_id, e
-            )
-    
-    # Clean up client resources
+        return 0
+
+    total = 0
+    bulk_supported = True
+    for chunk in itertools.batched(filter(None, doc_ids), _BULK_DELETE_CHUNK_SIZE):
+        total += len(chunk)
+        if bulk_supported:
+            try:
+                client.delete_documents_bulk_sync(list(chunk))
+                logger.debug("Successfully bulk-deleted %d RAG documents", len(chunk))
+                continue
+            except BulkDeleteUnsupportedError:
+                logger.info(
+                    "RAG service has no bulk delete endpoint; deleting documents one by one"
+                )
+                bulk_supported = False
+            except RAGServiceError as e:
+                logger.warning(
+                    "Failed to bulk-delete %d RAG documents: %s", len(chunk), e
+                )
+                continue
+        _delete_rag_documents_one_by_one(client, chunk)
+
+    # Release the client's pooled connections on the shared background loop.
     try:
-        # In a sync context, we can't await close(), but RAGClient uses httpx.AsyncClient
-        # The sync wrappers manage their own loops, so the main client instance might need
-        # to be closed if it was opened globally, but here it's local.
-        pass 
-    except Exception:
-        pass
+        client.close_sync()
+    except Exception as e:
+        logger.debug("Failed to close RAGClient after deletions: %s", e)
+
+    return total
 
 
 @receiver(pre_delete, sender=MonitoredChannel)
@@ -68,17 +125,34 @@ def delete_channel_rag_data(sender, instance: MonitoredChannel, **kwargs) -> Non
         ingested=True,
     )
 
-    doc_ids = [m.rag_document_id for m in msgs if m.rag_document_id]
-    if doc_ids:
+    # Only the document IDs are needed; skip loading full model instances.
+    doc_ids = (
+        msgs.exclude(rag_document_id__isnull=True)
+        .exclude(rag_document_id="")
+        .values_list("rag_document_id", flat=True)
+    )
+    # Cheap preflight so channels with nothing in RAG never open a cursor or client.
+    if doc_ids.exists():
+        logger.info("Deleting RAG documents for channel @%s", channel_username)
+        # Stream IDs straight into the bulk-delete chunks instead of building a list.
+        deleted = _delete_rag_documents(doc_ids.iterator(chunk_size=_DOC_ID_FETCH_SIZE))
         logger.info(
-            "Deleting %d RAG documents for channel @%s",
-            len(doc_ids),
+            "Processed %d RAG document deletions for channel @%s",
+            deleted,
             channel_username,
         )
-        _delete_rag_documents(doc_ids)
 
     # Clean up local ingestion records regardless of remote deletion success.
-    deleted_count, _ = msgs.delete()
+    records = IngestedTelegramMessage.objects.filter(
+        channel_username=channel_username,
+        ingested=True,
+    )
+    if _RAW_DELETE_SAFE:
+        # Single DELETE ... WHERE, no collector walk or per-row signals.
+        deleted_count = records._raw_delete(
+            router.db_for_write(IngestedTelegramMessage))
+    else:
+        deleted_count, _ = records.delete()
     logger.info(
         "Deleted %d IngestedTelegramMessage records for channel @%s",
         deleted_count,
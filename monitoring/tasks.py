@@ -1,16 +1,27 @@
 import asyncio
+import functools
 import hashlib
+import itertools
 import re
 import logging
+from datetime import timedelta
 from celery import shared_task
+from celery.signals import worker_process_init, worker_process_shutdown
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router, transaction
+from django.db.models import Min, Q
 from django.utils import timezone
 from asgiref.sync import sync_to_async
 from telethon import TelegramClient
-from telethon.tl.types import Message
+from telethon.errors import ChannelInvalidError, ChannelPrivateError, PeerIdInvalidError
+from telethon.tl.types import InputPeerChannel, Message
 
 from .models import MonitoredChannel, IngestedTelegramMessage
 from core.services.rag_client import RAGClient
-from core.exceptions import RAGServiceError
+from core.tasks import _get_rag_client
+from core.services.event_loop import run_sync
+from core.exceptions import RAGServiceError, BulkIngestUnsupportedError
 from core.config import TelegramConfig, RAGConfig
 
 logger = logging.getLogger(__name__)
@@ -18,28 +29,77 @@ logger = logging.getLogger(__name__)
 # --- Smart Filtering (same as before) ---
 
 
+_AD_KEYWORDS = ['تبلیغ', 'خرید', 'فروش', 'سفارش', 'تخفیف']
+_AD_RE = re.compile("|".join(map(re.escape, _AD_KEYWORDS)))
+
+
+# Ten words need at least ten characters plus nine separators.
+_MIN_RELEVANT_LENGTH = 19
+
+
 def is_message_relevant(message: Message) -> bool:
     """A smart filter to decide if a message is worth ingesting."""
-    if not message.text or len(message.text.split()) < 10:
+    # Cheapest checks first: an attribute and a length bound before any scan.
+    if message.is_reply:
         return False
-    ad_keywords = ['تبلیغ', 'خرید', 'فروش', 'سفارش', 'تخفیف']
-    if any(keyword in message.text for keyword in ad_keywords):
+    text = message.text
+    if not text or len(text) < _MIN_RELEVANT_LENGTH:
         return False
-    if message.is_reply:
+    # maxsplit stops after the 10th word instead of splitting the whole text.
+    if len(text.split(maxsplit=9)) < 10:
+        return False
+    if _AD_RE.search(text):
         return False
     return True
 
 # --- API Ingestion (same as before) ---
 
 
+_WHITESPACE_RE = re.compile(r"\s+")
+_URL_RE = re.compile(r"https?://\S+")
+
+
 def _normalize_text(text: str) -> str:
     # Collapse whitespace and trim; keep case (Persian) as-is.
-    return re.sub(r"\s+", " ", (text or "").strip())
+    text = (text or "").strip()
+    # Quick check: every whitespace character except the ASCII space is
+    # non-printable, so printable text without double spaces is already
+    # normalized and the regex pass can be skipped.
+    if "  " not in text and text.isprintable():
+        return text
+    return _WHITESPACE_RE.sub(" ", text)
 
 
-def _content_hash(text: str) -> str:
+def _hash_text(text: str) -> bytes:
     normalized = _normalize_text(text)
-    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return hashlib.sha256(normalized.encode("utf-8")).digest()
+
+
+# Reposts and retried batches hash the same text again within a worker process.
+_cached_hash_text = functools.lru_cache(maxsize=4096)(_hash_text)
+
+# Longer texts bypass the cache so a few huge messages cannot bloat it.
+_HASH_CACHE_MAX_LENGTH = 16 * 1024
+
+
+def _content_hash(text: str) -> bytes:
+    if len(text) < _HASH_CACHE_MAX_LENGTH:
+        return _cached_hash_text(text)
+    return _hash_text(text)
+
+
+# Channel signature / footer lines, matched in a single pass:
+#  - pure @username
+#  - emoji(s) + @username, e.g. "🆔 @SharifDaily"
+#  - short label + handle, e.g. "ID: @something" / "Channel: @something"
+# Telegram usernames are ASCII-only, so the handle uses an ASCII class rather
+# than Unicode \w. The two prefix branches are both needed: an emoji/symbol
+# run may be longer than the 10 characters a label is allowed.
+_SIGNATURE_LINE_RE = re.compile(r"(?:[^\w@]*|.{0,10})@[A-Za-z0-9_]+")
+_BOLD_RE = re.compile(r"\*\*(.*?)\*\*")
+_ITALIC_RE = re.compile(r"__(.*?)__")
+_CODE_RE = re.compile(r"`([^`]+)`")
+_EXCESS_NEWLINES_RE = re.compile(r"\n{3,}")
 
 
 def _clean_message_text(raw: str) -> str:
@@ -55,37 +115,26 @@ def _clean_message_text(raw: str) -> str:
 
     text = raw
 
-    import re
-
     # Remove common channel tag / signature lines:
     #  - lines that start with emojis then @username (e.g. "🆔 @SharifDaily")
     #  - lines that are only @username
     #  - lines like "channel: @something"
     cleaned_lines = []
     for line in text.splitlines():
-        stripped = line.strip()
-        # pure @username
-        if re.fullmatch(r"@[\w\d_]+", stripped):
-            continue
-        # emoji(s) + @username, e.g. "🆔 @SharifDaily"
-        if re.fullmatch(r"[^\w@]*@[\w\d_]+", stripped):
-            continue
-        # patterns like "ID: @something" / "Channel: @something"
-        if re.fullmatch(r".{0,10}@[\w\d_]+", stripped):
-            # short label + handle, usually a footer
+        if _SIGNATURE_LINE_RE.fullmatch(line.strip()):
             continue
         cleaned_lines.append(line)
     text = "\n".join(cleaned_lines)
 
     # Remove basic markdown markers while keeping content
     # **bold** or __italic__
-    text = re.sub(r"\*\*(.*?)\*\*", r"\1", text)
-    text = re.sub(r"__(.*?)__", r"\1", text)
+    text = _BOLD_RE.sub(r"\1", text)
+    text = _ITALIC_RE.sub(r"\1", text)
     # inline code `code`
-    text = re.sub(r"`([^`]+)`", r"\1", text)
+    text = _CODE_RE.sub(r"\1", text)
 
     # Collapse 3+ newlines to max 2
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _EXCESS_NEWLINES_RE.sub("\n\n", text)
     # Trim trailing whitespace on each line
     text = "\n".join(l.rstrip() for l in text.splitlines())
     return text.strip()
@@ -93,256 +142,908 @@ def _clean_message_text(raw: str) -> str:
 
 # --- Async DB Helpers ---
 
+# Number of relevant messages written to the DB together in one batch.
+_INGEST_BATCH_SIZE = 500
+
+# Concurrent per-message RAG requests per ingest task; well within the
+# RAGClient's default pool of 32 connections.
+_RAG_CONCURRENCY = 4
+
+# Harvests that try a failing message before giving up on it; until then it
+# keeps the channel's min_id below itself so every harvest retries it.
+_MAX_INGEST_ATTEMPTS = 5
+
+# How long a pending record may hold a channel's min_id below itself. Records
+# whose message was deleted from the channel are never seen (nor attempted)
+# again, so without this they would pin min_id forever.
+_PENDING_RETRY_WINDOW = timedelta(days=1)
+
+# How long an ingest task holds the records it claimed. Matching the hard task
+# time limit means a claim only lapses once its task can no longer be running;
+# failed records are retried once it has passed.
+_INGEST_LEASE = timedelta(seconds=getattr(settings, "CELERY_TASK_TIME_LIMIT", None) or 30 * 60)
+
+# Fields an ingestion attempt may change; written back with one bulk UPDATE.
+_INGEST_RESULT_FIELDS = [
+    "ingested",
+    "ingested_at",
+    "rag_document_id",
+    "last_error",
+    "attempts",
+    "last_attempt_at",
+    "updated_at",
+]
+
+# Columns read back after the upsert: what ingestion reads plus everything it
+# may write, so bulk_update never touches a deferred field.
+_INGEST_RECORD_FIELDS = ["external_id", "source_url", "content_hash", *_INGEST_RESULT_FIELDS]
+
+
+# Columns written by the upsert; on conflict only the message metadata is refreshed.
+_UPSERT_INSERT_FIELDS = [
+    "external_id",
+    "channel",
+    "channel_username",
+    "message_id",
+    "source_url",
+    "content_hash",
+    "ingested",
+    "attempts",
+    "created_at",
+    "updated_at",
+]
+_UPSERT_UPDATE_FIELDS = ["channel", "channel_username", "message_id", "source_url", "content_hash"]
+
+
+def _upsert_messages_returning(records, connection):
+    """
+    PostgreSQL: INSERT ... ON CONFLICT (external_id) DO UPDATE ... RETURNING.
+
+    One round-trip both writes the batch and returns the stored ingestion
+    state of every row, including rows that already existed.
+    """
+    meta = IngestedTelegramMessage._meta
+    quote = connection.ops.quote_name
+    insert_fields = [meta.get_field(name) for name in _UPSERT_INSERT_FIELDS]
+    update_columns = [meta.get_field(name).column for name in _UPSERT_UPDATE_FIELDS]
+    returning = [meta.get_field(name) for name in ["id", *_INGEST_RECORD_FIELDS]]
+
+    row_sql = "(%s)" % ", ".join(["%s"] * len(insert_fields))
+    sql = "INSERT INTO %s (%s) VALUES %s ON CONFLICT (%s) DO UPDATE SET %s RETURNING %s" % (
+        quote(meta.db_table),
+        ", ".join(quote(field.column) for field in insert_fields),
+        ", ".join([row_sql] * len(records)),
+        quote(meta.get_field("external_id").column),
+        ", ".join(f"{quote(column)} = EXCLUDED.{quote(column)}" for column in update_columns),
+        ", ".join(quote(field.column) for field in returning),
+    )
+    params = [
+        field.get_db_prep_save(field.pre_save(rec, add=True), connection)
+        for rec in records
+        for field in insert_fields
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    attnames = [field.attname for field in returning]
+    external_id_index = attnames.index("external_id")
+    return {
+        row[external_id_index]: IngestedTelegramMessage.from_db(connection.alias, attnames, row)
+        for row in rows
+    }
+
+
+@sync_to_async
+def db_upsert_messages(records):
+    """
+    Insert ingestion records in one statement, refreshing metadata of existing rows.
+
+    Returns the current rows keyed by external_id, so callers see the stored
+    ``ingested`` state of messages that were already known.
+    """
+    connection = connections[router.db_for_write(IngestedTelegramMessage)]
+    if connection.vendor == "postgresql":
+        return _upsert_messages_returning(records, connection)
+
+    IngestedTelegramMessage.objects.bulk_create(
+        records,
+        update_conflicts=True,
+        unique_fields=["external_id"],
+        update_fields=_UPSERT_UPDATE_FIELDS,
+    )
+    return IngestedTelegramMessage.objects.only(*_INGEST_RECORD_FIELDS).in_bulk(
+        [rec.external_id for rec in records], field_name="external_id"
+    )
+
+
 @sync_to_async
-def db_get_or_create_message(external_id, defaults):
-    return IngestedTelegramMessage.objects.get_or_create(
-        external_id=external_id,
-        defaults=defaults
+def db_harvest_state(channel_username, last_message_id=0):
+    """
+    Return ``(min_id, ingested_ids)`` bounding what a harvest must fetch.
+
+    Everything up to ``last_message_id``, the newest message seen by the last
+    complete harvest, was already recorded or filtered out, so only newer
+    messages need fetching. ``min_id`` stays below the oldest record still
+    worth retrying, i.e. not ingested, with attempts left and created within
+    _PENDING_RETRY_WINDOW; older pending records (e.g. of messages deleted
+    from the channel) no longer hold it back. ``ingested_ids`` are the
+    message IDs above ``min_id`` that need no further attempt: ingested ones
+    and those that ran out of attempts.
+    """
+    messages = IngestedTelegramMessage.objects.filter(channel_username=channel_username)
+    first_pending = messages.filter(
+        ingested=False,
+        attempts__lt=_MAX_INGEST_ATTEMPTS,
+        created_at__gte=timezone.now() - _PENDING_RETRY_WINDOW,
+    ).aggregate(first_pending=Min("message_id"))["first_pending"]
+    min_id = last_message_id
+    if first_pending is not None:
+        min_id = min(min_id, first_pending - 1)
+    ingested_ids = set(
+        messages.filter(
+            Q(ingested=True) | Q(attempts__gte=_MAX_INGEST_ATTEMPTS),
+            message_id__gt=min_id,
+        ).values_list("message_id", flat=True)
     )
+    return min_id, ingested_ids
 
 
 @sync_to_async
-def db_check_duplicate_content(content_hash, external_id):
-    return IngestedTelegramMessage.objects.filter(
-        content_hash=content_hash, ingested=True
-    ).exclude(external_id=external_id).exists()
+def db_save_last_message_id(channel_id, last_message_id):
+    MonitoredChannel.objects.filter(
+        pk=channel_id, last_message_id__lt=last_message_id
+    ).update(last_message_id=last_message_id)
 
 
 @sync_to_async
-def db_save_record(record, update_fields):
-    record.save(update_fields=update_fields)
+def db_save_channel_peer(pk, channel_id, access_hash):
+    MonitoredChannel.objects.filter(pk=pk).update(
+        channel_id=channel_id, access_hash=access_hash)
 
 
-async def ingest_message_to_kb_async(message: Message, channel_username: str):
+def db_claim_records(ids):
     """
-    Constructs and sends the message to the knowledge base API.
-    Async version to avoid event loop conflicts when using RAGClient.
+    Lease the records among ``ids`` that still need ingesting; return their IDs.
+
+    A record is claimable while it is not ingested, has attempts left and no
+    other claim or attempt happened within _INGEST_LEASE. Claiming stamps
+    ``last_attempt_at`` under row locks, so two tasks never claim the same row.
     """
-    # Extract URLs from the original message text (before cleaning)
-    raw_text = message.text or ""
-    # Regex to find http/https URLs
-    found_urls = re.findall(r'(https?://[^\s]+)', raw_text)
+    now = timezone.now()
+    with transaction.atomic():
+        claimed = list(
+            IngestedTelegramMessage.objects.select_for_update(skip_locked=True)
+            .filter(pk__in=ids, ingested=False, attempts__lt=_MAX_INGEST_ATTEMPTS)
+            .filter(Q(last_attempt_at__isnull=True) | Q(last_attempt_at__lt=now - _INGEST_LEASE))
+            .values_list("pk", flat=True)
+        )
+        IngestedTelegramMessage.objects.filter(pk__in=claimed).update(last_attempt_at=now)
+    return claimed
+
+
+@sync_to_async
+def db_check_duplicate_content_bulk(hashes):
+    """Return the subset of ``hashes`` already ingested under some message."""
+    return {
+        bytes(content_hash)
+        for content_hash in IngestedTelegramMessage.objects.filter(
+            content_hash__in=hashes, ingested=True
+        ).values_list("content_hash", flat=True)
+    }
+
+
+@sync_to_async
+def db_bulk_update_records(records, fields):
+    IngestedTelegramMessage.objects.bulk_update(
+        records, fields, batch_size=_INGEST_BATCH_SIZE)
+
+
+def _message_external_id(channel_username: str, message_id: int) -> str:
+    return f"telegram:{channel_username}:{message_id}"
+
+
+def _message_link(channel_username: str, message_id: int) -> str:
+    return f"https://t.me/{channel_username}/{message_id}"
+
+
+def _extract_urls(raw_text: str) -> list[str]:
+    """Return the distinct non-Telegram http/https URLs found in a message."""
     urls_to_process = []
-    for url in found_urls:
+    for url in _URL_RE.findall(raw_text):
         # Simple cleanup of trailing punctuation often caught by regex
         # Added | and () to the list of chars to strip
         clean_url = url.rstrip('.,;:!?"\')>])|')
         # Skip Telegram links to avoid circular or useless ingestion
         if "t.me/" not in clean_url and "telegram.me/" not in clean_url:
             urls_to_process.append(clean_url)
-    urls_to_process = list(set(urls_to_process))
-
-    message_link = f"https://t.me/{channel_username}/{message.id}"
-    external_id = f"telegram:{channel_username}:{message.id}"
-    content_hash = _content_hash(message.text or "")
-
-    # ---- Deduplication guard ----
-    rec, created = await db_get_or_create_message(
-        external_id=external_id,
-        defaults={
-            "channel_username": channel_username,
-            "message_id": int(message.id),
-            "source_url": message_link,
-            "content_hash": content_hash,
-        },
-    )
+    return list(set(urls_to_process))
 
-    if rec.ingested:
-        # Already ingested successfully.
-        return
-
-    dedup_by_content = TelegramConfig.get_dedup_by_content()
-    if dedup_by_content:
-        is_duplicate = await db_check_duplicate_content(content_hash, external_id)
-        if is_duplicate:
-            # Mark as "ingested" to avoid rechecking every run, but keep note.
-            rec.ingested = True
-            rec.ingested_at = timezone.now()
-            rec.last_error = "Skipped due to duplicate content hash."
-            await db_save_record(rec, update_fields=["ingested", "ingested_at", "last_error", "updated_at"])
-            return
 
+def _channel_message_payload(
+    message: Message, channel_username: str, rec: IngestedTelegramMessage
+) -> dict:
+    """Build the ingest_channel_message fields for one Telegram message."""
     # Clean text before sending to RAG
     cleaned_text = _clean_message_text(message.text or "")
 
     # Create a title from the first 100 characters of the CLEANED message
-    title = cleaned_text[:100] if len(cleaned_text) > 100 else cleaned_text
     if len(cleaned_text) > 100:
-        title += "..."
+        title = cleaned_text[:100] + "..."
+    else:
+        title = cleaned_text
+    published_at = message.date.isoformat()
+
+    return {
+        "title": title,
+        "text_content": cleaned_text,
+        "published_at": published_at,
+        "source_url": rec.source_url,
+        "metadata": {
+            "source": "telegram_channel",
+            "channel": channel_username,
+            "message_id": message.id,
+            "message_date": published_at,
+            "external_id": rec.external_id,
+        },
+    }
+
+
+async def _ingest_extracted_urls(
+    item: dict, channel_username: str, rec: IngestedTelegramMessage, rag_client: RAGClient
+):
+    """Ingest the URLs found in a message; failures never fail the message itself."""
+    for url in item["urls"]:
+        try:
+            logger.debug(
+                "Processing URL extracted from message %s: %s", item["message_id"], url)
+            url_res = await rag_client.ingest_url(
+                url_to_fetch=url,
+                metadata={
+                    "source": "telegram_link",
+                    "original_channel": channel_username,
+                    "original_message_id": item["message_id"],
+                    "original_message_url": rec.source_url,
+                }
+            )
+            url_doc_id = url_res.get("id") or url_res.get("document_id")
+            logger.debug(
+                "Successfully ingested extracted URL %s (doc_id=%s)", url, url_doc_id)
+        except Exception as e:
+            # Log warning but don't fail the message ingestion
+            logger.warning("Failed to ingest extracted URL %s: %s", url, e)
+
+
+def _mark_ingested(rec: IngestedTelegramMessage, result: dict | None) -> bool:
+    """
+    Record an ingest result on ``rec``; return whether the message was ingested.
+
+    Only a result carrying a document ID counts. Anything else is written to
+    ``last_error``, so the record stays pending and is retried.
+    """
+    if not isinstance(result, dict):
+        rec.last_error = "RAG service returned no result for this message."
+        return False
+    doc_id = result.get("id") or result.get("document_id")
+    if result.get("error") or not doc_id:
+        rec.last_error = str(
+            result.get("error") or "RAG service returned no document ID.")
+        return False
+    rec.ingested = True
+    rec.ingested_at = timezone.now()
+    rec.last_error = None
+    rec.rag_document_id = str(doc_id)
+    return True
+
+
+def _match_bulk_results(items, results: list) -> list:
+    """
+    Pair bulk ingest results with ``items``; unmatched items get None.
+
+    Results are matched by the external_id they echo back when there is one,
+    otherwise by position, which is only trusted when every message got a
+    result.
+    """
+    by_external_id = {}
+    for result in results:
+        if isinstance(result, dict):
+            external_id = result.get("external_id") or (
+                result.get("metadata") or {}).get("external_id")
+            if external_id:
+                by_external_id[external_id] = result
+    if by_external_id:
+        return [by_external_id.get(rec.external_id) for _, rec in items]
+    if len(results) == len(items):
+        return list(results)
+    return [None] * len(items)
 
-    # Use RAGClient for ingestion
-    client = RAGClient()
+
+def _ingest_item(message: Message, channel_username: str, rec: IngestedTelegramMessage) -> dict:
+    """
+    Build the JSON-serializable work item ingest_channel_messages_task sends.
+
+    Everything ingestion needs from the Telegram message is extracted here,
+    so the task never sees Telethon objects.
+    """
+    return {
+        "id": rec.pk,
+        "message_id": message.id,
+        "payload": _channel_message_payload(message, channel_username, rec),
+        # Extract URLs from the original message text (before cleaning)
+        "urls": _extract_urls(message.text or ""),
+    }
+
+
+async def ingest_message_to_kb_async(
+    item: dict,
+    channel_username: str,
+    rec: IngestedTelegramMessage,
+    rag_client: RAGClient,
+):
+    """
+    Constructs and sends the message to the knowledge base API.
+    Async version to avoid event loop conflicts when using RAGClient.
+
+    ``item`` comes from _ingest_item(). ``rag_client`` is owned by the caller
+    and shared across messages, so its connection pool stays warm. The outcome
+    is recorded on ``rec`` in memory only; the caller persists it together
+    with the rest of the chunk.
+    """
     try:
         # Update attempt tracking
         rec.attempts = (rec.attempts or 0) + 1
         rec.last_attempt_at = timezone.now()
-        rec.source_url = message_link
-        rec.content_hash = content_hash
-        await db_save_record(rec, update_fields=["attempts", "last_attempt_at", "source_url", "content_hash", "updated_at"])
-
-        result = await client.ingest_channel_message(
-            title=title,
-            text_content=cleaned_text,
-            published_at=message.date.isoformat(),
-            source_url=message_link,
-            metadata={
-                "source": "telegram_channel",
-                "channel": channel_username,
-                "message_id": message.id,
-                "message_date": message.date.isoformat(),
-                "external_id": external_id,
-            },
-        )
 
-        doc_id = result.get("id") or result.get("document_id")
+        result = await rag_client.ingest_channel_message(**item["payload"])
 
-        logger.info(
+        logger.debug(
             "Successfully ingested message %s from %s (doc_id=%s)",
-            message.id,
+            item["message_id"],
             channel_username,
-            doc_id,
+            result.get("id") or result.get("document_id"),
         )
 
-        # Process any URLs found in the message
-        for url in urls_to_process:
-            try:
-                logger.info(
-                    f"Processing URL extracted from message {message.id}: {url}")
-                url_res = await client.ingest_url(
-                    url_to_fetch=url,
-                    metadata={
-                        "source": "telegram_link",
-                        "original_channel": channel_username,
-                        "original_message_id": message.id,
-                        "original_message_url": message_link,
-                    }
-                )
-                url_doc_id = url_res.get("id") or url_res.get("document_id")
-                logger.info(
-                    f"Successfully ingested extracted URL {url} (doc_id={url_doc_id})")
-            except Exception as e:
-                # Log warning but don't fail the message ingestion
-                logger.warning(f"Failed to ingest extracted URL {url}: {e}")
-
-        rec.ingested = True
-        rec.ingested_at = timezone.now()
-        rec.last_error = None
-        if doc_id:
-            rec.rag_document_id = str(doc_id)
-
-        await db_save_record(rec, update_fields=[
-            "ingested",
-            "ingested_at",
-            "last_error",
-            "rag_document_id",
-            "updated_at",
-        ])
+        if _mark_ingested(rec, result):
+            # Process any URLs found in the message
+            await _ingest_extracted_urls(item, channel_username, rec, rag_client)
 
     except RAGServiceError as e:
         error_msg = str(e)
         logger.error(
             "Error ingesting message %s from %s: %s",
-            message.id,
+            item["message_id"],
             channel_username,
             error_msg,
         )
         rec.last_error = error_msg
-        await db_save_record(rec, update_fields=["last_error", "updated_at"])
     except Exception as e:
         error_msg = f"Unexpected error: {str(e)}"
         logger.exception(
             "Unexpected error ingesting message %s from %s: %s",
-            message.id,
+            item["message_id"],
             channel_username,
             error_msg,
         )
         rec.last_error = error_msg
-        await db_save_record(rec, update_fields=["last_error", "updated_at"])
-    finally:
-        await client.close()
+
+
+async def _ingest_messages_async(items, channel_username: str, rag_client: RAGClient):
+    """
+    Send a chunk of (item, record) pairs in one bulk request.
+
+    Falls back to one request per message when the RAG service has no bulk
+    ingest endpoint. Per-message requests (fallback ingests and extracted URLs)
+    run concurrently, at most _RAG_CONCURRENCY at a time per call. Outcomes
+    are recorded on the records in memory only.
+    """
+    semaphore = asyncio.Semaphore(_RAG_CONCURRENCY)
+
+    async def bounded(coro):
+        async with semaphore:
+            await coro
+
+    payloads = [item["payload"] for item, _ in items]
+    try:
+        results = await rag_client.ingest_channel_messages_bulk(payloads)
+    except BulkIngestUnsupportedError:
+        await asyncio.gather(*(
+            bounded(ingest_message_to_kb_async(
+                item, channel_username, rec, rag_client))
+            for item, rec in items
+        ))
+        return
+    except Exception as e:
+        error_msg = str(e) if isinstance(e, RAGServiceError) else f"Unexpected error: {str(e)}"
+        logger.error(
+            "Error bulk-ingesting %d messages from %s: %s",
+            len(items),
+            channel_username,
+            error_msg,
+        )
+        results = None
+
+    now = timezone.now()
+    matched = _match_bulk_results(items, results) if results is not None else None
+    url_ingests = []
+    for index, (item, rec) in enumerate(items):
+        # Update attempt tracking
+        rec.attempts = (rec.attempts or 0) + 1
+        rec.last_attempt_at = now
+        if matched is None:
+            rec.last_error = error_msg
+            continue
+        if _mark_ingested(rec, matched[index]):
+            url_ingests.append(bounded(
+                _ingest_extracted_urls(item, channel_username, rec, rag_client)))
+    await asyncio.gather(*url_ingests)
+
+    if matched is not None:
+        logger.debug(
+            "Ingested %d of %d messages from %s",
+            len(url_ingests),
+            len(items),
+            channel_username,
+        )
+
+
+@shared_task
+def ingest_channel_messages_task(channel_username: str, items: list[dict]):
+    """
+    Send one chunk of harvested channel messages to the RAG service.
+
+    Harvests only record and enqueue relevant messages, so RAG latency never
+    holds the Telegram client or a channel's harvest lock, and ingest
+    parallelism follows worker concurrency. Harvests may enqueue a record
+    again before an earlier task got to it, so only records this task claims
+    are sent. Failures are written to the records; their pending state makes
+    a later harvest enqueue them again once the claim has lapsed.
+    """
+    claimed = db_claim_records([item["id"] for item in items])
+    if not claimed:
+        return
+    records = IngestedTelegramMessage.objects.only(*_INGEST_RECORD_FIELDS).in_bulk(claimed)
+    pending = [(item, records[item["id"]]) for item in items if item["id"] in records]
+
+    # The worker's shared client is bound to the background loop.
+    run_sync(_ingest_messages_async(pending, channel_username, _get_rag_client()))
+
+    now = timezone.now()
+    attempted = [rec for _, rec in pending]
+    for rec in attempted:
+        rec.updated_at = now
+    IngestedTelegramMessage.objects.bulk_update(
+        attempted, _INGEST_RESULT_FIELDS, batch_size=_INGEST_BATCH_SIZE)
+
+
+@sync_to_async
+def _enqueue_ingest_chunks(channel_username: str, chunks: list[list[dict]]):
+    for items in chunks:
+        ingest_channel_messages_task.delay(channel_username, items)
+
+
+async def _ingest_batch_async(
+    messages: list[Message],
+    channel: MonitoredChannel,
+    ingested_hashes: set,
+    queued_hashes: set,
+    dedup_by_content: bool,
+    chunk_size: int,
+):
+    """
+    Record a batch of relevant messages from one channel and enqueue their ingest.
+
+    Records for the whole batch are upserted with one statement. Messages
+    that were already ingested, or whose record is claimed by an ingest task
+    or failed within _INGEST_LEASE, are skipped. The rest are handed to
+    ingest_channel_messages_task in chunks of up to ``chunk_size``, one bulk
+    RAG request each.
+
+    ``ingested_hashes`` and ``queued_hashes`` are shared by all batches of a
+    harvest run; they collect the content hashes known to be ingested and
+    those already enqueued, so duplicates are skipped when
+    ``dedup_by_content`` is on.
+    """
+    channel_username = channel.username
+    records = await db_upsert_messages([
+        IngestedTelegramMessage(
+            external_id=_message_external_id(channel_username, message.id),
+            channel=channel,
+            channel_username=channel_username,
+            message_id=int(message.id),
+            source_url=_message_link(channel_username, message.id),
+            content_hash=_content_hash(message.text or ""),
+        )
+        for message in messages
+    ])
+
+    lease_start = timezone.now() - _INGEST_LEASE
+    pending = []
+    for message in messages:
+        rec = records[_message_external_id(channel_username, message.id)]
+        if rec.ingested or rec.attempts >= _MAX_INGEST_ATTEMPTS:
+            # Already ingested successfully, or given up on.
+            continue
+        if rec.last_attempt_at is not None and rec.last_attempt_at >= lease_start:
+            # Being ingested right now, or failed too recently to retry yet.
+            continue
+        pending.append((message, rec))
+
+    if dedup_by_content and pending:
+        unknown = {bytes(rec.content_hash) for _, rec in pending} - ingested_hashes
+        if unknown:
+            ingested_hashes.update(
+                await db_check_duplicate_content_bulk(list(unknown)))
+
+    skipped = []
+    to_send = []
+    for message, rec in pending:
+        if dedup_by_content:
+            content_hash = bytes(rec.content_hash)
+            if content_hash in ingested_hashes:
+                # Mark as "ingested" to avoid rechecking every run, but keep note.
+                rec.ingested = True
+                rec.ingested_at = timezone.now()
+                rec.last_error = "Skipped due to duplicate content hash."
+                rec.updated_at = timezone.now()
+                skipped.append(rec)
+                continue
+            if content_hash in queued_hashes:
+                # Same text is already on its way; the next harvest will see
+                # it ingested and skip this copy.
+                continue
+            queued_hashes.add(content_hash)
+        to_send.append(_ingest_item(message, channel_username, rec))
+
+    if skipped:
+        await db_bulk_update_records(skipped, _INGEST_RESULT_FIELDS)
+    if to_send:
+        await _enqueue_ingest_chunks(
+            channel_username, [list(chunk) for chunk in itertools.batched(to_send, chunk_size)])
 
 # --- Main Celery Task ---
 
+# Relevant messages fetched ahead of the batch consumer.
+_HARVEST_QUEUE_SIZE = 64
+
+# Upper bound (seconds) on how long a channel lock or harvest slot is held.
+_HARVEST_LOCK_TIMEOUT = 60 * 60
+
+# A harvest that finds every slot taken retries this often (seconds), at most
+# this many times, before giving the channel back to the next beat. Waiting
+# plus the task time limit stays within _HARVEST_LOCK_TIMEOUT.
+_HARVEST_SLOT_RETRY_DELAY = 30
+_HARVEST_SLOT_RETRIES = 40
+
+
+def _harvest_lock_key(username: str) -> str:
+    return f"monitoring:harvest-lock:{username}"
+
+
+def _acquire_harvest_slot():
+    """
+    Take one of the TELEGRAM_HARVEST_CONCURRENCY harvest slots.
+
+    All harvests share one Telegram account, so this caps how many run at
+    once across every worker. A SQLite session file cannot be used by several
+    processes at once ("database is locked"), so without a session string
+    there is a single slot. Returns the slot's cache key, or None if all
+    slots are taken; slots expire on their own if a worker dies.
+    """
+    slots = TelegramConfig.get_harvest_concurrency() if TelegramConfig.get_session_string() else 1
+    for slot in range(max(slots, 1)):
+        slot_key = f"monitoring:harvest-slot:{slot}"
+        if cache.add(slot_key, 1, timeout=_HARVEST_LOCK_TIMEOUT):
+            return slot_key
+    return None
+
+
+async def _resolve_channel_peer(client, channel: MonitoredChannel):
+    """
+    Return the input peer to read ``channel`` from.
+
+    Resolving a username costs a ResolveUsername RPC, so the resulting
+    InputPeerChannel is stored on the channel and rebuilt locally afterwards.
+    """
+    if channel.channel_id is not None and channel.access_hash is not None:
+        return InputPeerChannel(channel.channel_id, channel.access_hash)
+    peer = await client.get_input_entity(channel.username)
+    if isinstance(peer, InputPeerChannel):
+        channel.channel_id = peer.channel_id
+        channel.access_hash = peer.access_hash
+        await db_save_channel_peer(channel.pk, peer.channel_id, peer.access_hash)
+    return peer
+
+
+# Errors meaning a stored channel_id/access_hash no longer works for this
+# account, e.g. after a session swap or when the channel went private.
+_STALE_PEER_ERRORS = (ChannelInvalidError, ChannelPrivateError, PeerIdInvalidError)
+
 
 async def _harvest_channel_async(client, channel: MonitoredChannel):
-    """Asynchronous logic to harvest a single channel."""
+    """
+    Asynchronous logic to harvest a single channel.
+
+    Telegram messages are fetched by a producer loop and handed to a single
+    batch consumer through a bounded queue, so fetching the next page of
+    history overlaps with recording the messages already fetched. The
+    consumer flushes full batches only, so ingest tasks get full chunks. The
+    RAG requests themselves run in ingest_channel_messages_task.
+
+    History up to the newest message seen by the last complete harvest is
+    not fetched again, except to retry pending records, and messages
+    ingested by earlier runs are dropped up front, so they cost no DB or RAG
+    work at all.
+    """
     channel_username = channel.username
     limit = channel.rag_message_count if channel.rag_message_count > 0 else None
 
-    print(
-        f"--- Harvesting channel: {channel_username} (limit: {limit or 'all'}) ---")
+    logger.info("Harvesting channel %s (limit: %s)", channel_username, limit or "all")
+
     try:
-        async for message in client.iter_messages(channel_username, limit=limit):
-            if is_message_relevant(message):
-                # Run ingestion logic asynchronously
-                await ingest_message_to_kb_async(message, channel_username)
+        min_id, ingested_ids = await db_harvest_state(
+            channel_username, channel.last_message_id)
+        peer_cached = channel.channel_id is not None and channel.access_hash is not None
+        peer = await _resolve_channel_peer(client, channel)
     except Exception as e:
-        print(f"Could not process channel {channel_username}: {e}")
+        logger.error("Could not process channel %s: %s", channel_username, e)
+        return
 
+    queue = asyncio.Queue(maxsize=_HARVEST_QUEUE_SIZE)
+    ingested_hashes = set()
+    queued_hashes = set()
+    # Read once per run rather than once per batch.
+    dedup_by_content = TelegramConfig.get_dedup_by_content()
+    chunk_size = RAGConfig.get_batch_size()
+    max_seen = min_id
+    complete = True
+    scanned = kept = 0
 
-@shared_task
-def harvest_channels_task():
-    """The main Celery task to run the channel harvesting logic."""
-    # Fetch channel list from the database
-    channels = list(MonitoredChannel.objects.all())
-    if not channels:
-        print("No channels to monitor. Exiting.")
-        return
+    async def flush(batch):
+        nonlocal complete
+        try:
+            await _ingest_batch_async(
+                batch, channel, ingested_hashes, queued_hashes, dedup_by_content, chunk_size)
+        except Exception as e:
+            # Messages of a failed batch may have no record to retry from.
+            complete = False
+            # Keep consuming so the producer never blocks on a full queue.
+            logger.error(
+                "Could not enqueue batch from channel %s: %s", channel_username, e)
 
-    # Get Telegram credentials from config
+    async def consume():
+        # The batch is flushed once full, and whatever is left once None
+        # marks the end of the harvest.
+        batch = []
+        while (message := await queue.get()) is not None:
+            batch.append(message)
+            if len(batch) >= _INGEST_BATCH_SIZE:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+
+    async def produce(peer):
+        nonlocal scanned, kept, max_seen
+        async for message in client.iter_messages(peer, limit=limit, min_id=min_id):
+            scanned += 1
+            max_seen = max(max_seen, message.id)
+            if message.id not in ingested_ids and is_message_relevant(message):
+                kept += 1
+                await queue.put(message)
+
+    # Recording runs one DB call at a time on the thread-sensitive
+    # sync_to_async thread anyway, so more consumers would only split batches.
+    consumer = asyncio.create_task(consume())
+    try:
+        try:
+            await produce(peer)
+        except _STALE_PEER_ERRORS as e:
+            if not peer_cached or scanned:
+                raise
+            # Forget the stored peer and resolve the username once more.
+            logger.warning(
+                "Stored peer of channel %s is no longer valid (%s); resolving it again",
+                channel_username,
+                e,
+            )
+            channel.channel_id = None
+            channel.access_hash = None
+            await db_save_channel_peer(channel.pk, None, None)
+            await produce(await _resolve_channel_peer(client, channel))
+    except Exception as e:
+        complete = False
+        logger.error("Could not process channel %s: %s", channel_username, e)
+    finally:
+        await queue.put(None)
+        await consumer
+
+    logger.info(
+        "Harvested %d/%d messages from channel %s", kept, scanned, channel_username)
+
+    # Only a complete run may move the watermark past filtered-out messages.
+    if complete and max_seen > channel.last_message_id:
+        try:
+            await db_save_last_message_id(channel.pk, max_seen)
+        except Exception as e:
+            logger.error(
+                "Could not save last message ID for channel %s: %s", channel_username, e)
+
+
+def _build_telegram_client():
+    """
+    Build a Telethon client from the configured credentials.
+
+    Returns None when TELEGRAM_API_ID / TELEGRAM_API_HASH are missing.
+    """
     api_id = TelegramConfig.get_api_id()
     api_hash = TelegramConfig.get_api_hash()
     session_string = TelegramConfig.get_session_string()
 
     if not api_id or not api_hash:
-        print("❌ TELEGRAM_API_ID / TELEGRAM_API_HASH are not configured. Exiting.")
-        return
+        return None
 
-    # Initialize Telegram Client
     from telethon.sessions import StringSession
     import os
 
     if session_string:
-        # Use StringSession if available (avoids SQLite locking issues in containers)
-        # print("Using StringSession for Telegram client.")
-        client = TelegramClient(StringSession(
-            session_string), api_id, api_hash)
-    else:
-        # Fallback to SQLite session file
-        session_path = os.path.join(os.path.dirname(
-            __file__), '..', 'sessions', 'telegram_session')
-        # print(f"Using SQLite session file: {session_path}")
-        client = TelegramClient(session_path, api_id, api_hash)
+        # Use StringSession if available (avoids SQLite locking issues in containers,
+        # and lets several workers harvest channels at the same time)
+        return TelegramClient(StringSession(session_string), api_id, api_hash)
+
+    # Fallback to SQLite session file; only one process may use it at a time,
+    # which _acquire_harvest_slot and _release_telegram_client ensure.
+    session_path = os.path.join(os.path.dirname(
+        __file__), '..', 'sessions', 'telegram_session')
+    return TelegramClient(session_path, api_id, api_hash)
+
+
+# One connected Telegram client per worker process. Connecting (key exchange,
+# DC lookup) costs several round-trips, so it is kept open across harvests; its
+# connection is bound to the background event loop, so it must only be used
+# from coroutines run there.
+_TELEGRAM_CLIENT = None
+# Guards creating/connecting the client when harvests overlap on the loop.
+_TELEGRAM_CLIENT_LOCK = asyncio.Lock()
+
+
+async def _get_telegram_client():
+    """Return the worker's connected Telegram client, or None if unconfigured."""
+    global _TELEGRAM_CLIENT
+    async with _TELEGRAM_CLIENT_LOCK:
+        if _TELEGRAM_CLIENT is None:
+            client = _build_telegram_client()
+            if client is None:
+                return None
+            _TELEGRAM_CLIENT = client
+        if not _TELEGRAM_CLIENT.is_connected():
+            await _TELEGRAM_CLIENT.connect()
+        return _TELEGRAM_CLIENT
+
+
+async def _release_telegram_client() -> None:
+    """Disconnect and drop the worker's client, closing its session file."""
+    global _TELEGRAM_CLIENT
+    async with _TELEGRAM_CLIENT_LOCK:
+        if _TELEGRAM_CLIENT is None:
+            return
+        try:
+            await _TELEGRAM_CLIENT.disconnect()
+        finally:
+            _TELEGRAM_CLIENT = None
+
+
+@worker_process_init.connect
+def _reset_telegram_client(**kwargs) -> None:
+    """Never reuse a Telegram client inherited from the parent process across fork."""
+    global _TELEGRAM_CLIENT, _TELEGRAM_CLIENT_LOCK
+    _TELEGRAM_CLIENT = None
+    _TELEGRAM_CLIENT_LOCK = asyncio.Lock()
+
+
+@worker_process_shutdown.connect
+def _disconnect_telegram_client(**kwargs) -> None:
+    """Disconnect the shared Telegram client when a worker process exits."""
+    global _TELEGRAM_CLIENT
+    if _TELEGRAM_CLIENT is None:
+        return
+    try:
+        run_sync(_TELEGRAM_CLIENT.disconnect())
+    except Exception as e:
+        logger.warning("Failed to disconnect shared Telegram client: %s", e)
+    finally:
+        _TELEGRAM_CLIENT = None
+
+
+@shared_task
+def harvest_channels_task():
+    """
+    The main Celery task: fan channel harvesting out to one task per channel.
+
+    Each channel is harvested by its own harvest_single_channel_task, so Celery
+    can spread them over all workers and a slow channel no longer holds up the rest.
+    A channel's lock is taken here and held until its harvest ends, so a beat
+    only dispatches channels that are not already queued or being harvested;
+    how many harvests run at once is capped by the harvest slots.
+    """
+    # Fetch channel list from the database
+    usernames = list(MonitoredChannel.objects.values_list("username", flat=True))
+    if not usernames:
+        logger.info("No channels to monitor. Exiting.")
+        return
+
+    for username in usernames:
+        # The lock expires on its own if the harvest task is lost.
+        lock_key = _harvest_lock_key(username)
+        if cache.add(lock_key, 1, timeout=_HARVEST_LOCK_TIMEOUT):
+            try:
+                harvest_single_channel_task.delay(username)
+            except Exception:
+                # No task will release the lock, so the next beat could not
+                # dispatch the channel until it expired.
+                cache.delete(lock_key)
+                raise
+
+
+@shared_task(bind=True, max_retries=None)
+def harvest_single_channel_task(self, username: str):
+    """
+    Harvest a single monitored channel with the worker's shared Telegram client.
+
+    The channel's lock was taken by harvest_channels_task and is released
+    here; the task waits for a free harvest slot by retrying, still holding it.
+    """
+    lock_key = _harvest_lock_key(username)
+    channel = MonitoredChannel.objects.filter(username=username).first()
+    if channel is None:
+        logger.info("Channel %s is no longer monitored. Skipping.", username)
+        cache.delete(lock_key)
+        return
+
+    slot_key = _acquire_harvest_slot()
+    if slot_key is None:
+        if self.request.retries < _HARVEST_SLOT_RETRIES:
+            raise self.retry(countdown=_HARVEST_SLOT_RETRY_DELAY)
+        logger.info("No harvest slot came free for channel %s. Skipping.", username)
+        cache.delete(lock_key)
+        return
 
     async def main():
         """
-        Use an already-authorized user session to harvest messages from channels.
+        Use an already-authorized user session to harvest messages from the channel.
 
-        This function assumes that the session file for `session_name` has been
-        created beforehand by running `python create_telegram_session.py` once
-        (which calls client.start() interactively with your phone number).
+        This function assumes that the session has been created beforehand by
+        running `python create_telegram_session.py` once (which calls
+        client.start() interactively with your phone number).
 
         In a non-interactive environment (Celery worker) we only connect and
         check authorization; if the user is not authorized we log a message and
         stop without prompting for phone or code.
         """
+        # Initialize Telegram Client
+        client = await _get_telegram_client()
+        if client is None:
+            logger.error("TELEGRAM_API_ID / TELEGRAM_API_HASH are not configured. Exiting.")
+            return
+
+        if not await client.is_user_authorized():
+            logger.error(
+                "Telegram session is not authorized. "
+                "Please run 'python create_telegram_session.py' once to create the session file, "
+                "then restart the worker."
+            )
+            return
+
         try:
-            await client.connect()
-
-            if not await client.is_user_authorized():
-                print(
-                    "❌ Telegram session is not authorized. "
-                    "Please run 'python create_telegram_session.py' once to create the session file, "
-                    "then restart the worker."
-                )
-                return
-
-            tasks = [
-                _harvest_channel_async(client, channel) for channel in channels
-            ]
-            await asyncio.gather(*tasks)
+            await _harvest_channel_async(client, channel)
         finally:
-            await client.disconnect()
+            # An idle client would keep the SQLite session file open in this
+            # process while the next harvest runs in another one.
+            if not TelegramConfig.get_session_string():
+                await _release_telegram_client()
 
-    # Run the async main function
-    asyncio.run(main())
+    # Run on the background loop the shared Telegram client is bound to.
+    try:
+        run_sync(main())
+    finally:
+        cache.delete(slot_key)
+        cache.delete(lock_key)
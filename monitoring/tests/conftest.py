@@ -0,0 +1,42 @@
+"""Pytest configuration and fixtures."""
+from datetime import datetime, timezone as dt_timezone
+from types import SimpleNamespace
+
+import pytest
+from monitoring.models import MonitoredChannel, IngestedTelegramMessage
+from monitoring.tasks import _content_hash, _message_external_id, _message_link
+
+
+@pytest.fixture
+def channel():
+    """Create a test monitored channel."""
+    return MonitoredChannel.objects.create(username="sharif_news")
+
+
+@pytest.fixture
+def make_record(channel):
+    """Return a factory for ingestion records of the test channel."""
+    def make(message_id, text="", **fields):
+        return IngestedTelegramMessage.objects.create(
+            external_id=_message_external_id(channel.username, message_id),
+            channel=channel,
+            channel_username=channel.username,
+            message_id=message_id,
+            source_url=_message_link(channel.username, message_id),
+            content_hash=_content_hash(text),
+            **fields,
+        )
+    return make
+
+
+@pytest.fixture
+def make_message():
+    """Return a factory for stand-ins of Telethon messages."""
+    def make(message_id, text):
+        return SimpleNamespace(
+            id=message_id,
+            text=text,
+            date=datetime(2026, 10, 16, tzinfo=dt_timezone.utc),
+            is_reply=False,
+        )
+    return make
@@ -0,0 +1,29 @@
+"""Tests for monitoring models."""
+import pytest
+
+
+@pytest.mark.django_db
+class TestMonitoredChannel:
+    """Tests for MonitoredChannel model."""
+
+    @pytest.mark.parametrize("old_count, new_count, expected_last_message_id", [
+        (100, 200, 0),
+        (100, 0, 0),
+        (100, 50, 42),
+        (100, 100, 42),
+        (0, 500, 42),
+    ])
+    def test_set_rag_message_count(
+        self, channel, old_count, new_count, expected_last_message_id
+    ):
+        """Test that only a larger window (0 = no limit) resets the watermark."""
+        channel.rag_message_count = old_count
+        channel.last_message_id = 42
+        channel.save()
+
+        channel.set_rag_message_count(new_count)
+        channel.save()
+        channel.refresh_from_db()
+
+        assert channel.rag_message_count == new_count
+        assert channel.last_message_id == expected_last_message_id
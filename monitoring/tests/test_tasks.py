@@ -0,0 +1,285 @@
+"""Tests for monitoring tasks."""
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connections
+from django.utils import timezone
+from monitoring import tasks
+from monitoring.models import IngestedTelegramMessage
+from monitoring.tasks import (
+    _MAX_INGEST_ATTEMPTS,
+    _content_hash,
+    _ingest_batch_async,
+    _ingest_item,
+    _message_external_id,
+    _message_link,
+    db_harvest_state,
+    db_upsert_messages,
+    ingest_channel_messages_task,
+)
+
+
+@pytest.mark.django_db
+class TestHarvestState:
+    """Tests for db_harvest_state."""
+
+    def test_starts_at_watermark(self, channel, make_record):
+        """Test that history up to last_message_id is not fetched again."""
+        make_record(3, ingested=True)
+        make_record(12, ingested=True)
+        min_id, ingested_ids = async_to_sync(db_harvest_state)(channel.username, 10)
+        assert min_id == 10
+        assert ingested_ids == {12}
+
+    def test_pending_record_holds_min_id(self, channel, make_record):
+        """Test that a pending record keeps min_id below itself."""
+        make_record(3, ingested=True)
+        make_record(5, attempts=1)
+        make_record(7, ingested=True)
+        min_id, ingested_ids = async_to_sync(db_harvest_state)(channel.username, 10)
+        assert min_id == 4
+        assert ingested_ids == {7}
+
+    def test_exhausted_record_does_not_hold_min_id(self, channel, make_record):
+        """Test that a record out of attempts is skipped instead of retried."""
+        make_record(5, attempts=_MAX_INGEST_ATTEMPTS)
+        make_record(8, attempts=1)
+        min_id, ingested_ids = async_to_sync(db_harvest_state)(channel.username, 10)
+        assert min_id == 7
+        assert ingested_ids == set()
+
+        min_id, ingested_ids = async_to_sync(db_harvest_state)(channel.username, 0)
+        assert min_id == 0
+        assert ingested_ids == {5}
+
+    def test_stale_pending_record_does_not_hold_min_id(self, channel, make_record):
+        """Test that an old pending record (e.g. a deleted message) stops pinning min_id."""
+        make_record(5, attempts=1, created_at=timezone.now() - timedelta(days=2))
+        min_id, _ = async_to_sync(db_harvest_state)(channel.username, 10)
+        assert min_id == 10
+
+    def test_other_channels_are_ignored(self, channel, make_record):
+        """Test that only the harvested channel's records count."""
+        make_record(5, attempts=1)
+        min_id, ingested_ids = async_to_sync(db_harvest_state)("other_channel", 10)
+        assert min_id == 10
+        assert ingested_ids == set()
+
+
+@pytest.mark.django_db
+class TestUpsertMessages:
+    """Tests for db_upsert_messages."""
+
+    @pytest.fixture(params=["postgresql", "fallback"])
+    def vendor(self, request, monkeypatch):
+        """Run each test on the RETURNING path and on the bulk_create read-back."""
+        connection = connections["default"]
+        if request.param == "postgresql" and connection.vendor != "postgresql":
+            pytest.skip("INSERT ... RETURNING path needs PostgreSQL")
+        if request.param == "fallback" and connection.vendor == "postgresql":
+            monkeypatch.setattr(connection, "vendor", "fallback")
+        return request.param
+
+    def _new_record(self, channel, message_id, text):
+        return IngestedTelegramMessage(
+            external_id=_message_external_id(channel.username, message_id),
+            channel=channel,
+            channel_username=channel.username,
+            message_id=message_id,
+            source_url=_message_link(channel.username, message_id),
+            content_hash=_content_hash(text),
+        )
+
+    def test_returns_stored_state(self, vendor, channel, make_record):
+        """Test that existing rows come back with their stored ingestion state."""
+        existing = make_record(1, "old text", ingested=True, attempts=2)
+        records = async_to_sync(db_upsert_messages)([
+            self._new_record(channel, 1, "new text"),
+            self._new_record(channel, 2, "other text"),
+        ])
+
+        assert set(records) == {
+            _message_external_id(channel.username, 1),
+            _message_external_id(channel.username, 2),
+        }
+        kept = records[existing.external_id]
+        assert kept.pk == existing.pk
+        assert kept.ingested is True
+        assert kept.attempts == 2
+        assert bytes(kept.content_hash) == _content_hash("new text")
+
+        created = records[_message_external_id(channel.username, 2)]
+        assert created.pk is not None
+        assert created.ingested is False
+        assert created.attempts == 0
+        assert IngestedTelegramMessage.objects.count() == 2
+
+
+@pytest.mark.django_db
+class TestIngestBatch:
+    """Tests for _ingest_batch_async."""
+
+    @pytest.fixture
+    def enqueued(self, monkeypatch):
+        """Capture the ingest tasks a batch enqueues instead of sending them."""
+        calls = []
+        monkeypatch.setattr(
+            ingest_channel_messages_task,
+            "delay",
+            lambda channel_username, items: calls.append(items),
+        )
+        return calls
+
+    def _ingest(self, messages, channel, dedup_by_content=True):
+        async_to_sync(_ingest_batch_async)(
+            messages, channel, set(), set(), dedup_by_content, 32)
+
+    def test_dedup_by_content(self, channel, make_record, make_message, enqueued):
+        """Test that known and repeated content is not sent twice."""
+        make_record(1, "already ingested", ingested=True)
+        self._ingest([
+            make_message(2, "already ingested"),
+            make_message(3, "new text"),
+            make_message(4, "new text"),
+            make_message(5, "other text"),
+        ], channel)
+
+        sent = [item["message_id"] for chunk in enqueued for item in chunk]
+        assert sent == [3, 5]
+
+        duplicate = IngestedTelegramMessage.objects.get(message_id=2)
+        assert duplicate.ingested is True
+        assert duplicate.last_error == "Skipped due to duplicate content hash."
+        # A repeat within the run stays pending until its original is ingested.
+        assert IngestedTelegramMessage.objects.get(message_id=4).ingested is False
+
+    def test_dedup_disabled(self, channel, make_record, make_message, enqueued):
+        """Test that every new message is sent when content dedup is off."""
+        make_record(1, "already ingested", ingested=True)
+        self._ingest([
+            make_message(2, "already ingested"),
+            make_message(3, "already ingested"),
+        ], channel, dedup_by_content=False)
+
+        sent = [item["message_id"] for chunk in enqueued for item in chunk]
+        assert sent == [2, 3]
+
+    def test_skips_ingested_and_leased_records(
+        self, channel, make_record, make_message, enqueued
+    ):
+        """Test that ingested, exhausted and in-flight records are not enqueued."""
+        make_record(1, "one", ingested=True)
+        make_record(2, "two", attempts=_MAX_INGEST_ATTEMPTS)
+        make_record(3, "three", last_attempt_at=timezone.now())
+        self._ingest([
+            make_message(1, "one"),
+            make_message(2, "two"),
+            make_message(3, "three"),
+            make_message(4, "four"),
+        ], channel)
+
+        sent = [item["message_id"] for chunk in enqueued for item in chunk]
+        assert sent == [4]
+
+
+class FakeRAGClient:
+    """Records bulk ingest payloads and answers with one result per message."""
+
+    def __init__(self):
+        self.payloads = []
+        self.results = None
+
+    async def ingest_channel_messages_bulk(self, messages):
+        self.payloads.extend(messages)
+        if self.results is not None:
+            return self.results
+        return [{"id": f"doc-{index}"} for index, _ in enumerate(messages)]
+
+
+@pytest.mark.django_db
+class TestIngestChannelMessagesTask:
+    """Tests for ingest_channel_messages_task."""
+
+    @pytest.fixture
+    def rag_client(self, monkeypatch):
+        """Replace the worker's shared RAGClient."""
+        client = FakeRAGClient()
+        monkeypatch.setattr(tasks, "_get_rag_client", lambda: client)
+        return client
+
+    def test_sends_only_claimable_records(
+        self, channel, make_record, make_message, rag_client
+    ):
+        """Test that ingested, exhausted and already claimed records are skipped."""
+        records = [
+            make_record(1, "one", ingested=True),
+            make_record(2, "two", attempts=_MAX_INGEST_ATTEMPTS),
+            make_record(3, "three", last_attempt_at=timezone.now()),
+            make_record(4, "four"),
+        ]
+        items = [
+            _ingest_item(make_message(rec.message_id, text), channel.username, rec)
+            for rec, text in zip(records, ["one", "two", "three", "four"])
+        ]
+
+        ingest_channel_messages_task(channel.username, items)
+
+        assert [payload["metadata"]["message_id"] for payload in rag_client.payloads] == [4]
+        sent = IngestedTelegramMessage.objects.get(message_id=4)
+        assert sent.ingested is True
+        assert sent.attempts == 1
+        assert sent.rag_document_id == "doc-0"
+        assert IngestedTelegramMessage.objects.get(message_id=2).attempts == (
+            _MAX_INGEST_ATTEMPTS
+        )
+        assert IngestedTelegramMessage.objects.get(message_id=3).ingested is False
+
+    def test_second_run_claims_nothing(self, channel, make_record, make_message, rag_client):
+        """Test that a duplicate task for the same records sends nothing."""
+        rec = make_record(1, "one")
+        items = [_ingest_item(make_message(1, "one"), channel.username, rec)]
+
+        ingest_channel_messages_task(channel.username, items)
+        ingest_channel_messages_task(channel.username, items)
+
+        assert len(rag_client.payloads) == 1
+
+    def test_result_without_document_id_stays_pending(
+        self, channel, make_record, make_message, rag_client
+    ):
+        """Test that only results carrying a document ID mark records ingested."""
+        records = [make_record(1, "one"), make_record(2, "two")]
+        items = [
+            _ingest_item(make_message(rec.message_id, text), channel.username, rec)
+            for rec, text in zip(records, ["one", "two"])
+        ]
+        rag_client.results = [{"id": "doc-1"}, {"error": "Embedding failed"}]
+
+        ingest_channel_messages_task(channel.username, items)
+
+        assert IngestedTelegramMessage.objects.get(message_id=1).ingested is True
+        failed = IngestedTelegramMessage.objects.get(message_id=2)
+        assert failed.ingested is False
+        assert failed.attempts == 1
+        assert failed.last_error == "Embedding failed"
+
+    def test_short_results_are_matched_by_external_id(
+        self, channel, make_record, make_message, rag_client
+    ):
+        """Test that a short result list only marks the records it names."""
+        records = [make_record(1, "one"), make_record(2, "two")]
+        items = [
+            _ingest_item(make_message(rec.message_id, text), channel.username, rec)
+            for rec, text in zip(records, ["one", "two"])
+        ]
+        rag_client.results = [
+            {"id": "doc-2", "metadata": {"external_id": records[1].external_id}},
+        ]
+
+        ingest_channel_messages_task(channel.username, items)
+
+        assert IngestedTelegramMessage.objects.get(message_id=1).ingested is False
+        matched = IngestedTelegramMessage.objects.get(message_id=2)
+        assert matched.ingested is True
+        assert matched.rag_document_id == "doc-2"
@@ -30,6 +30,9 @@ TELEGRAM_API_HASH = config("TELEGRAM_API_HASH", default=None)
 # Harvester deduplication: skip ingesting messages whose normalized text was already ingested
 TELEGRAM_DEDUP_BY_CONTENT = config(
     "TELEGRAM_DEDUP_BY_CONTENT", default=False, cast=bool)
+# Harvester pacing: channel harvests running at once (one Telegram account)
+TELEGRAM_HARVEST_CONCURRENCY = config(
+    "TELEGRAM_HARVEST_CONCURRENCY", default=4, cast=int)
 
 
 # AI Services
@@ -42,6 +45,11 @@ RAG_USER_ID = config("RAG_USER_ID", default=5, cast=int)
 # Microservice name for RAG (must match between ingest and search)
 # Allowed values: support_assistant, telegram_bot
 RAG_MICROSERVICE = config("RAG_MICROSERVICE", default="telegram_bot")
+# Default executor size for the background event loop that runs RAG calls
+# from sync code (Celery tasks, signal handlers)
+RAG_TASK_POOL = config("RAG_TASK_POOL", default=64, cast=int)
+# Channel messages per bulk ingest request
+RAG_BATCH_SIZE = config("RAG_BATCH_SIZE", default=32, cast=int)
 
 # LangSmith Observability
 LANGSMITH_API_KEY = config("LANGSMITH_API_KEY", default=None)
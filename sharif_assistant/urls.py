@@ -1,12 +1,12 @@
 """URL configuration for sharif_assistant project."""
 from django.contrib import admin
 from django.urls import path
-from decouple import config
 
 from bot.views import telegram_webhook, bot_health_check, prometheus_metrics
+from core.config import TelegramConfig
 
-# Get webhook path from config
-webhook_path = config("WEBHOOK_PATH", default="webhook").strip("/")
+# Resolved once at import, from the same source the bot registers its webhook with
+webhook_path = TelegramConfig.get_webhook_path().strip("/")
 
 urlpatterns = [
     path("admin/", admin.site.urls),